@@ -1,78 +1,335 @@
 import argparse
+import re
 import sys
 import os
-import json
-from datetime import datetime
-from src.session_manager import SessionManager
+import time
+
+# Accuracy degrades when too many questions share one completion
+MAX_BATCH_SIZE = 16
+
+# Emoji decoration is for humans at a terminal; when output is piped or
+# redirected (or PCAPAI_NO_EMOJI is set) emit plain grep-friendly lines.
+# Hoisted to import time so the branch is taken once, not per print.
+_DECOR = sys.stdout.isatty() and os.environ.get("PCAPAI_NO_EMOJI") is None
+
+def _e(emoji):
+    """Return the emoji prefix for decorated output, or nothing."""
+    return emoji + " " if _DECOR else ""
 
 # Global session manager (will be initialized in main)
 session = None
 
+# Accepted feedback spellings -> canonical rating
+FEEDBACK_MAP = {
+    's': 'satisfied', 'satisfied': 'satisfied',
+    'n': 'neutral', 'neutral': 'neutral',
+    'u': 'unsatisfied', 'unsatisfied': 'unsatisfied',
+}
+
+def collect_feedback():
+    """Prompt for a response rating and optional reason (test mode)."""
+    while True:
+        raw = input("\n📊 Rate the AI's response [s=satisfied | n=neutral | u=unsatisfied]: ").strip().lower()
+        rating = FEEDBACK_MAP.get(raw)
+        if rating:
+            break
+        print("❌ Please respond with 'satisfied', 'neutral', or 'unsatisfied'")
+
+    reason = ""
+    try:
+        reason = input("\n💭 Would you like to provide a reason for your rating? (If not, then press Enter to skip): ").strip()
+    except (KeyboardInterrupt, EOFError):
+        reason = ""
+
+    print(f"✓ Thank you for your feedback! Rating: {rating}")
+    return rating, reason
+
 def read_openai_key(key_file):
-    """Read OpenAI API key from file."""
+    """Read OpenAI API key from file (bounded: keys are short ASCII tokens)."""
     try:
-        with open(key_file, 'r') as f:
-            return f.read().strip()
+        with open(key_file, 'rb') as f:
+            return f.read(256).decode('ascii').strip()
     except FileNotFoundError:
         print(f"Error: OpenAI key file '{key_file}' not found.")
         sys.exit(1)
+    except UnicodeDecodeError:
+        print(f"Error: '{key_file}' is not a text key file.")
+        sys.exit(1)
 
 def show_session_status():
-    """Display current session status."""
+    """Display current session status with a single buffered write."""
     info = session.get_session_info()
-    print("\n" + "="*50)
-    print("📋 SESSION STATUS")
-    print("="*50)
-    print(f"🔑 OpenAI Key: {'✓ Set' if info['openai_key_set'] else '❌ Not set'}")
-    print(f"📁 PCAP File: {info['pcap_file'] if info['pcap_file'] else '❌ Not set'}")
+    buf = [
+        "",
+        "="*50,
+        f"{_e('📋')}SESSION STATUS",
+        "="*50,
+        f"{_e('🔑')}OpenAI Key: {'✓ Set' if info['openai_key_set'] else '❌ Not set'}",
+        f"{_e('📁')}PCAP File: {info['pcap_file'] if info['pcap_file'] else '❌ Not set'}",
+    ]
     if info['pcap_file'] and info.get('file_size_kb', 0) > 0:
-        print(f"� PCAP Size: {info['file_size_kb']:.1f} KB")
-    print(f"�📊 PCAP Parsed: {'✓ Yes' if info['pcap_parsed'] else '❌ No'}")
-    print(f"🤖 AI Handler: {'✓ Ready' if info['ai_handler_ready'] else '❌ Not ready'}")
+        buf.append(f"{_e('�')}PCAP Size: {info['file_size_kb']:.1f} KB")
+    buf.append(f"{_e('📊')}PCAP Parsed: {'✓ Yes' if info['pcap_parsed'] else '❌ No'}")
+    buf.append(f"{_e('🤖')}AI Handler: {'✓ Ready' if info['ai_handler_ready'] else '❌ Not ready'}")
     if info['ai_handler_ready']:
-        print(f"🔧 Handler Type: {info.get('ai_handler_type', 'Unknown')}")
-    print(
-        f"🔧 Protocol Filter: {', '.join(info['protocol_filter']) if info['protocol_filter'] else 'None (all protocols)'}"
+        buf.append(f"{_e('🔧')}Handler Type: {info.get('ai_handler_type', 'Unknown')}")
+    buf.append(
+        f"{_e('🔧')}Protocol Filter: {', '.join(info['protocol_filter']) if info['protocol_filter'] else 'None (all protocols)'}"
     )
-    print(f"📦 Filtered Packets: {info['filtered_packets_count']:,}")
+    buf.append(f"{_e('📦')}Filtered Packets: {info['filtered_packets_count']:,}")
     if info['pcap_parsed']:
-        print(f"💾 Data Size: {info['data_size']:,} characters")
-    print("="*50 + "\n")
+        buf.append(f"{_e('💾')}Data Size: {info['data_size']:,} bytes")
+    buf.append("="*50 + "\n\n")
+    sys.stdout.write("\n".join(buf))
+
+# Static banner, assembled once at import instead of ~20 print calls
+_HELP_TEXT = "\n".join([
+    "",
+    "="*60,
+    f"{_e('🔧')}INTERACTIVE MODE COMMANDS",
+    "="*60,
+    f"{_e('📝')}query <your question>     - Ask a question about the pcap",
+    f"{_e('📥')}queue <your question>     - Queue a question for a batched call",
+    f"{_e('🚀')}batch                     - Answer all queued questions in one LLM call",
+    f"{_e('🔑')}key <path>                - Set OpenAI API key file",
+    f"{_e('📁')}pcap <path>               - Set pcap file to analyze",
+    f"{_e('📊')}status                    - Show current session status",
+    f"{_e('🔄')}clear                     - Clear current session",
+    f"{_e('❓')}help                      - Show this help",
+    f"{_e('🚪')}quit/exit                 - Exit the program",
+    "="*60,
+    f"{_e('🎯')}MODE INFORMATION",
+    "="*60,
+    f"{_e('🧪')}TEST MODE (--t)           - Collects feedback after each AI response",
+    "                             - Prompts for satisfaction rating & reason",
+    "                             - Used for improving AI model performance",
+    "                             - Saves feedback to dataset.json",
+    f"{_e('👤')}USER MODE (--u)           - Standard mode",
+    "="*60,
+    f"{_e('💡')}You can also just type your question directly!",
+    "="*60 + "\n\n",
+])
 
 def show_help():
     """Show interactive mode help."""
-    print("\n" + "="*60)
-    print("🔧 INTERACTIVE MODE COMMANDS")
-    print("="*60)
-    print("📝 query <your question>     - Ask a question about the pcap")
-    print("🔑 key <path>                - Set OpenAI API key file")
-    print("📁 pcap <path>               - Set pcap file to analyze")
-    print("📊 status                    - Show current session status")
-    print("🔄 clear                     - Clear current session")
-    print("❓ help                      - Show this help")
-    print("🚪 quit/exit                 - Exit the program")
-    print("="*60)
-    print("🎯 MODE INFORMATION")
-    print("="*60)
-    print("🧪 TEST MODE (--t)           - Collects feedback after each AI response")
-    print("                             - Prompts for satisfaction rating & reason")
-    print("                             - Used for improving AI model performance")
-    print("                             - Saves feedback to dataset.json")
-    print("👤 USER MODE (--u)           - Standard mode")
-    print("="*60)
-    print("💡 You can also just type your question directly!")
-    print("="*60 + "\n")
+    sys.stdout.write(_HELP_TEXT)
+
+def _split_numbered_answers(response, count):
+    """Split a batched response into per-question answers by their index prefix."""
+    answers = {}
+    current = None
+    lines = []
+    for line in response.splitlines():
+        match = re.match(r'\s*(\d+)[.):]\s*(.*)', line)
+        if match and 1 <= int(match.group(1)) <= count:
+            if current is not None:
+                answers[current] = "\n".join(lines).strip()
+            current = int(match.group(1))
+            lines = [match.group(2)]
+        elif current is not None:
+            lines.append(line)
+    if current is not None:
+        answers[current] = "\n".join(lines).strip()
+    # Fall back to the whole response if an index could not be recovered
+    return [answers.get(i, response) for i in range(1, count + 1)]
+
+def run_batched_queries(test_mode=False):
+    """Flush queued questions as a single LLM call and record the answers.
+
+    Packing the questions into one prompt sends the system context and
+    analysis data once instead of once per question, cutting both tokens
+    and round-trips roughly by the batch size.
+    """
+    if not session.pending_queries:
+        print("❌ No queued queries. Use: queue <question>")
+        return
+
+    if not session.get_openai_key():
+        print("❌ No OpenAI API key set. Use: key <path_to_key_file>")
+        return
+    if not session.get_parsed_data():
+        print("❌ No pcap data loaded. Use: pcap <path_to_pcap_file>")
+        return
+
+    queries = session.pending_queries[:MAX_BATCH_SIZE]
+    del session.pending_queries[:len(queries)]
+
+    ai_handler = session.get_ai_handler()
+    if not ai_handler:
+        print("❌ Failed to initialize AI handler")
+        return
+    filtered_packets, analysis_data = session.get_filtered_data()
+    if filtered_packets is None:
+        print("❌ No filtered packet data available")
+        return
+
+    print(f"🤖 Processing {len(queries)} queued queries in one call...")
+    combined = (
+        "Answer each of the following questions about this network traffic. "
+        "Prefix every answer with its question number (e.g. '1.') on its own line.\n"
+        + "\n".join(f"{i}. {q}" for i, q in enumerate(queries, 1))
+    )
+
+    try:
+        response = ai_handler.query(combined, analysis_data, session.conversation_history,
+                                    summary=session.analysis_summary)
+    except Exception as e:
+        print(f"❌ Error processing batch: {e}")
+        return
+
+    answers = _split_numbered_answers(response, len(queries))
+    for query, answer in zip(queries, answers):
+        sys.stdout.write(
+            "\n" + "="*50 + f"\n{_e('🤖')}{query}\n" + "="*50 + f"\n{answer}\n"
+        )
+        record = {
+            "session_id": session.session_id,
+            "ts": time.time_ns(),
+            "pcap_file": session.pcap_file,
+            "query": query,
+            "response": answer,
+            "test_mode": test_mode,
+            "batched": True
+        }
+        dataset_entry = {"query": query, "response": answer}
+        feedback = None
+        # In test mode, collect feedback per answer like the single-query path
+        if test_mode:
+            feedback, reason = collect_feedback()
+            record["feedback"] = {"rating": feedback, "reason": reason}
+            dataset_entry["feedback"] = {"rating": feedback, "reason": reason}
+        session.append_history(record)
+        session.append_dataset(dataset_entry)
+        session.conversation_history.append({
+            "query": query,
+            "response": answer
+        })
+        session.record_feedback(feedback)
+    print("="*50)
+
+def run_queries_file(path, test_mode=False):
+    """Run a file of independent questions (one per line) concurrently.
+
+    Dispatches through AIQueryHandler.query_batch, which keeps at most 8
+    requests in flight over the pooled connection; responses are printed
+    and recorded in input order. Handlers without query_batch (the
+    tool-calling handler mutates session state per call) run the same
+    questions sequentially.
+    """
+    try:
+        with open(path, 'r') as f:
+            queries = [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        print(f"❌ Queries file '{path}' not found.")
+        return
+
+    if not queries:
+        print("❌ Queries file is empty.")
+        return
+    if not session.get_openai_key():
+        print("❌ No OpenAI API key set. Use --key <path_to_key_file>")
+        return
+    if not session.get_parsed_data():
+        print("❌ No pcap data loaded. Use --pcap <path_to_pcap_file>")
+        return
+
+    session.set_protocol_filter(session.last_protocols)
+    ai_handler = session.get_ai_handler()
+    if not ai_handler:
+        print("❌ Failed to initialize AI handler")
+        return
+    filtered_packets, analysis_data = session.get_filtered_data()
+    if filtered_packets is None:
+        print("❌ No filtered packet data available")
+        return
+
+    if hasattr(ai_handler, 'query_batch'):
+        print(f"🚀 Running {len(queries)} queries (up to 8 in flight)...")
+        responses = ai_handler.query_batch(queries, analysis_data, summary=session.analysis_summary)
+    else:
+        # ToolCallingHandler applies pyshark filters to the shared session
+        # as part of each query, so its queries can't overlap.
+        print(f"🚀 Running {len(queries)} queries sequentially...")
+        responses = [
+            ai_handler.query(q, analysis_data, summary=session.analysis_summary)
+            for q in queries
+        ]
+
+    for query, response in zip(queries, responses):
+        sys.stdout.write(
+            "\n" + "="*50 + f"\n{_e('🤖')}{query}\n" + "="*50 + f"\n{response}\n"
+        )
+        session.append_history({
+            "session_id": session.session_id,
+            "ts": time.time_ns(),
+            "pcap_file": session.pcap_file,
+            "query": query,
+            "response": response,
+            "test_mode": test_mode
+        })
+        session.append_dataset({"query": query, "response": response})
+        session.record_feedback()
+    print("="*50)
+
+    session.save_session()
+    session.save_history_and_dataset()
+
+def _setup_readline():
+    """Enable line editing, persistent history and tab completion for the REPL.
+
+    Retyping long questions (or mistyping commands that then fall through
+    to the LLM as a query) is wasted round-trips; readline gives recall
+    with the up arrow and completion for the command words.
+    """
+    try:
+        import readline
+    except ImportError:
+        return  # platform without readline; plain input() still works
+
+    import atexit
+
+    histfile = os.path.join(".cache", "repl_history")
+    try:
+        os.makedirs(".cache", exist_ok=True)
+        readline.read_history_file(histfile)
+    except OSError:
+        pass
+    readline.set_history_length(1000)
+
+    def _save_history():
+        try:
+            readline.write_history_file(histfile)
+        except OSError:
+            pass
+
+    atexit.register(_save_history)
+
+    commands = ["query ", "queue ", "batch", "key ", "pcap ",
+                "status", "clear", "help", "quit", "exit"]
+
+    def _complete(text, state):
+        matches = [c for c in commands if c.startswith(text)]
+        return matches[state] if state < len(matches) else None
+
+    readline.set_completer(_complete)
+    readline.parse_and_bind("tab: complete")
 
 def interactive_mode(test_mode=False):
     """Run interactive session mode."""
-    print("\n" + "🎯" + "="*58 + "🎯")
-    if test_mode:
-        print("  🧪 PCAP AI TEST MODE - WITH FEEDBACK🧪")
-    else:
-        print("  🤖 WELCOME TO PCAP AI INTERACTIVE SESSION! 🤖")
-    print("🎯" + "="*58 + "🎯")
-    print("💡 Type 'help' for commands or just ask questions about your pcap!")
-    print("🚪 Type 'quit' or 'exit' to leave")
+    _setup_readline()
+    # Welcome banner in one buffered write, like the status/help banners
+    title = (
+        "  🧪 PCAP AI TEST MODE - WITH FEEDBACK🧪"
+        if test_mode
+        else "  🤖 WELCOME TO PCAP AI INTERACTIVE SESSION! 🤖"
+    )
+    sys.stdout.write("\n".join([
+        "\n🎯" + "="*58 + "🎯",
+        title,
+        "🎯" + "="*58 + "🎯",
+        "💡 Type 'help' for commands or just ask questions about your pcap!",
+        "🚪 Type 'quit' or 'exit' to leave\n",
+    ]))
     
     # Only show session status in test mode
     if test_mode:
@@ -101,76 +358,64 @@ def interactive_mode(test_mode=False):
     if session.get_parsed_data():
         session.set_protocol_filter(session.last_protocols)
 
+    def cmd_queue(arg):
+        session.pending_queries.append(arg)
+        print(f"✓ Queued ({len(session.pending_queries)} pending). Run them with: batch")
+
+    def cmd_key(arg):
+        if session.set_openai_key(arg.strip('"\'')):
+            print("✓ API key updated in session")
+
+    def cmd_pcap(arg):
+        if session.set_pcap_file(arg.strip('"\'')):
+            print("✓ PCAP file updated in session")
+            # The filtered view is rebuilt lazily on the next query,
+            # so the background parse overlaps with typing it
+
+    # One dict lookup per command instead of a chain of lower()/startswith
+    # checks; anything not in the table falls through to the query path.
+    commands = {
+        'help': lambda arg: show_help(),
+        'status': lambda arg: show_session_status(),
+        'clear': lambda arg: session.clear_session(),
+        'batch': lambda arg: run_batched_queries(test_mode),
+        'queue': cmd_queue,
+        'key': cmd_key,
+        'pcap': cmd_pcap,
+    }
+    # Commands that take no argument only match bare (e.g. 'status foo'
+    # stays a question); argument commands only match with one present.
+    no_arg_commands = {'help', 'status', 'clear', 'batch'}
+
     while True:
         try:
-            # if last_protocol is not set, ask the user for protocol input and filter again
-            if not session.last_protocols:
-                proto_input = (
-                    input("🌈 Please enter ONE protocol to focus on for this session: ")
-                    .strip()
-                    .upper()
-                )
-                if proto_input in known_protocols:
-                    session.last_protocols = [proto_input]
-                    session.set_protocol_filter(session.last_protocols)
-                    print(f"✅ Protocol set for session: {proto_input}")
-                else:
-                    print(
-                        f"❌ '{proto_input}' is not a valid protocol. Please choose from: {', '.join(known_protocols)}"
-                    )
-                    continue
-
             user_input = input("\n🤖 packetSense> ").strip()
-            
+
             if not user_input:
                 continue
-                
+
+            # Split once: command word plus the rest of the line
+            cmd, _, rest = user_input.partition(' ')
+            cmd = cmd.lower()
+            rest = rest.strip()
+
             # Handle exit commands
-            if user_input.lower() in ['quit', 'exit', 'q']:
+            if cmd in ('quit', 'exit', 'q') and not rest:
                 print("👋 Thanks for using PacketSense! Session saved.")
                 session.save_session()
                 session.save_history_and_dataset()
                 break
-                
-            # Handle help command
-            elif user_input.lower() == 'help':
-                show_help()
-                continue
-                
-            # Handle status command
-            elif user_input.lower() == 'status':
-                show_session_status()
-                continue
-                
-            # Handle clear command
-            elif user_input.lower() == 'clear':
-                session.clear_session()
-                continue
-                
-            # Handle key command
-            elif user_input.lower().startswith('key '):
-                key_path = user_input[4:].strip().strip('"\'')
-                if session.set_openai_key(key_path):
-                    print("✓ API key updated in session")
-                continue
-                
-            # Handle pcap command
-            elif user_input.lower().startswith('pcap '):
-                pcap_path = user_input[5:].strip().strip('"\'')
-                if session.set_pcap_file(pcap_path):
-                    print("✓ PCAP file updated in session")
-                    # Re-filter packets with current protocol
-                    session.set_protocol_filter(session.last_protocols)
+
+            handler = commands.get(cmd)
+            if handler is not None and (not rest) == (cmd in no_arg_commands):
+                handler(rest)
                 continue
-                
-            # Handle query command or direct question
+
+            # Query command or direct question
             else:
                 # Remove 'query ' prefix if present
-                if user_input.lower().startswith('query '):
-                    query = user_input[6:].strip()
-                else:
-                    query = user_input
-                
+                query = rest if cmd == 'query' and rest else user_input
+
                 # Check if we have required data
                 openai_key = session.get_openai_key()
                 parsed_data = session.get_parsed_data()
@@ -196,6 +441,11 @@ def interactive_mode(test_mode=False):
                         continue
 
                     filtered_packets, analysis_data = session.get_filtered_data()
+                    if filtered_packets is None:
+                        # e.g. right after 'clear' - rebuild the filtered set
+                        # once from the parsed data instead of re-prompting
+                        session.set_protocol_filter(session.last_protocols)
+                        filtered_packets, analysis_data = session.get_filtered_data()
                     if filtered_packets is None:
                         print("❌ No filtered packet data available")
                         continue
@@ -203,50 +453,22 @@ def interactive_mode(test_mode=False):
                     if test_mode:
                         print(f"🔎 Analysing {len(filtered_packets)} packets...")                    
 
-                    response = ai_handler.query(query, analysis_data, session.conversation_history)
+                    response = ai_handler.query(query, analysis_data, session.conversation_history,
+                                                summary=session.analysis_summary)
                     
-                    print("\n" + "="*50)
-                    print("🤖 AI RESPONSE")
-                    print("="*50)
-                    print(response)
-                    print("="*50)
+                    sys.stdout.write(
+                        "\n" + "="*50 + f"\n{_e('🤖')}AI RESPONSE\n" + "="*50
+                        + f"\n{response}\n" + "="*50 + "\n"
+                    )
                     
                     # In test mode, collect feedback
                     if test_mode:
-                        # Get feedback rating
-                        while True:
-                            try:
-                                feedback = input("\n📊 Rate the AI's response [s=satisfied | n=neutral | u=unsatisfied]: ").strip().lower()
-                                if feedback in ['satisfied', 'neutral', 'unsatisfied', 's', 'n', 'u']:
-                                    # Normalize to full words
-                                    if feedback in ['s', 'satisfied']:
-                                        feedback = 'satisfied'
-                                    elif feedback in ['n', 'neutral']:
-                                        feedback = 'neutral'
-                                    elif feedback in ['u', 'unsatisfied']:
-                                        feedback = 'unsatisfied'
-                                    break
-                                else:
-                                    print("❌ Please respond with 'satisfied', 'neutral', or 'unsatisfied'")
-                            except ValueError:
-                                print("❌ Please enter a valid response (satisfied/neutral/unsatisfied)")
-                        
-                        # Ask for optional reason
-                        reason = ""
-                        try:
-                            reason_input = input("\n💭 Would you like to provide a reason for your rating? (If not, then press Enter to skip): ").strip()
-                            if reason_input:
-                                reason = reason_input
-                        except (KeyboardInterrupt, EOFError):
-                            reason = ""
-                        
-                        print(f"✓ Thank you for your feedback! Rating: {feedback}")
-                        
+                        feedback, reason = collect_feedback()
+
                         # Update history and dataset with feedback
-                        session.history.append({
+                        session.append_history({
                             "session_id": session.session_id,
-                            "timestamp": datetime.now().isoformat(),
-                            "user_details": session.user_details,
+                            "ts": time.time_ns(),
                             "pcap_file": session.pcap_file,
                             "query": query,
                             "response": response,
@@ -256,7 +478,7 @@ def interactive_mode(test_mode=False):
                                 "reason": reason
                             }
                         })
-                        session.dataset.append({
+                        session.append_dataset({
                             "query": query, 
                             "response": response,
                             "feedback": {
@@ -268,38 +490,100 @@ def interactive_mode(test_mode=False):
                             "query": query,
                             "response": response
                         })
+                        session.record_feedback(feedback)
                     else:
                         # Update history and dataset without feedback
-                        session.history.append({
+                        session.append_history({
                             "session_id": session.session_id,
-                            "timestamp": datetime.now().isoformat(),
-                            "user_details": session.user_details,
+                            "ts": time.time_ns(),
                             "pcap_file": session.pcap_file,
                             "query": query,
                             "response": response,
                             "test_mode": False
                         })
-                        session.dataset.append({"query": query, "response": response})
+                        session.append_dataset({"query": query, "response": response})
                         session.conversation_history.append({
                             "query": query,
                             "response": response
                         })
+                        session.record_feedback()
                     
                 except Exception as e:
                     print(f"❌ Error processing query: {e}")
                     
         except KeyboardInterrupt:
-            print("\n👋 Session interrupted. Saving data...")
-            session.save_session()
-            session.save_history_and_dataset()
+            # Every state change is already persisted atomically when it
+            # happens (save_session uses os.replace, history/dataset are
+            # append-on-write), so there is nothing left to flush here.
+            print("\n👋 Session interrupted. Data already saved.")
             break
         except EOFError:
-            print("\n👋 Session ended. Saving data...")
-            session.save_session()
-            session.save_history_and_dataset()
+            print("\n👋 Session ended. Data already saved.")
             break
 
+def _fast_path(flag):
+    """Handle bare maintenance flags without argparse or SessionManager.
+
+    These invocations get embedded in shells and scripts, so they should
+    return in interpreter-startup time: everything heavier than pickle and
+    json stays un-imported.
+    """
+    import glob
+    import pickle
+
+    if flag == "--clear-history":
+        try:
+            os.makedirs(".cache", exist_ok=True)
+            with open(".cache/history.jsonl", "w"):
+                pass
+            print("✓ History cleared successfully")
+        except Exception as e:
+            print(f"⚠️  Could not clear history: {e}")
+    elif flag == "--clear":
+        try:
+            for stale in ("session_manifest.json", "session_data.pkl"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            for path in glob.glob(os.path.join(".cache", "parsed_*")):
+                os.remove(path)
+            print("✓ Session cleared successfully")
+        except Exception as e:
+            print(f"⚠️  Could not clear session file: {e}")
+    elif flag == "--status":
+        import json
+
+        data = {}
+        try:
+            if os.path.exists("session_manifest.json"):
+                with open("session_manifest.json", "r") as f:
+                    data = json.load(f)
+                data["parsed"] = bool(data.get("parsed_cache_path"))
+            elif os.path.exists("session_data.pkl"):
+                with open("session_data.pkl", "rb") as f:
+                    data = pickle.load(f)
+                data["parsed"] = data.get("parsed_data") is not None
+        except Exception as e:
+            print(f"⚠️  Could not load previous session: {e}")
+        pcap_file = data.get("pcap_file")
+        buf = [
+            "",
+            "="*50,
+            f"{_e('📋')}SESSION STATUS",
+            "="*50,
+            f"{_e('🔑')}OpenAI Key: {'✓ Set' if data.get('openai_key') else '❌ Not set'}",
+            f"{_e('📁')}PCAP File: {pcap_file if pcap_file else '❌ Not set'}",
+            f"{_e('📊')}PCAP Parsed: {'✓ Yes' if data.get('parsed') else '❌ No'}",
+            "="*50 + "\n\n",
+        ]
+        sys.stdout.write("\n".join(buf))
+
 def main():
+    # Short-circuit bare maintenance flags before paying for argparse
+    # construction (epilog formatting included) and the heavy imports.
+    if len(sys.argv) == 2 and sys.argv[1] in {"--status", "--clear", "--clear-history"}:
+        _fast_path(sys.argv[1])
+        return
+
     parser = argparse.ArgumentParser(
         description='AI-powered pcap file analyzer with session management',
         epilog="""
@@ -328,7 +612,9 @@ Examples:
     parser.add_argument('--status', action='store_true', help='Show current session status')
     parser.add_argument('--clear', action='store_true', help='Clear current session')
     parser.add_argument('--clear-history', action='store_true', help='Clear the history file')
+    parser.add_argument('--rebuild-stats', action='store_true', help='Recompute feedback statistics from history')
     parser.add_argument('--interactive', '-i', action='store_true', help='Force interactive mode')
+    parser.add_argument('--queries-file', help='Run questions from a file (one per line) concurrently, then exit')
     parser.add_argument('--t', action='store_true', help='Run in test mode')
     parser.add_argument('--u', action='store_true', help='Run in user mode')
     
@@ -352,21 +638,33 @@ Examples:
     if args.t:
         print("🧪 DEBUG: Running in TEST MODE")
     
-    # Initialize the global session with the correct mode
+    # Initialize the global session with the correct mode. SessionManager
+    # is imported here, not at module top: it transitively pulls pyshark
+    # and requests, which cost far more than argument handling itself.
     global session
+    from src.session_manager import SessionManager
     session = SessionManager(test_mode=args.t)
     
     # Handle clear-history request
     if args.clear_history:
-        history_file = ".cache/history.json"
         try:
-            with open(history_file, "w") as file:
-                json.dump([], file, indent=4)
+            # Truncating the JSONL file is an O(1) clear
+            with open(session.history_file, "w"):
+                pass
+            session.history = []
             print("✓ History cleared successfully")
         except Exception as e:
             print(f"⚠️  Could not clear history: {e}")
         return
     
+    # Handle rebuild-stats request (recovers from stats.json drift)
+    if args.rebuild_stats:
+        session.rebuild_feedback_stats()
+        stats = session.get_feedback_statistics()
+        print(f"✓ Feedback stats rebuilt: {stats['rated']}/{stats['total_queries']} rated, "
+              f"{stats['satisfaction_rate']:.0%} satisfied")
+        return
+
     # Handle clear request
     if args.clear:
         session.clear_session()
@@ -389,6 +687,11 @@ Examples:
             print("❌ Failed to set PCAP file")
             return
     
+    # Bulk mode: run queries from a file and exit
+    if args.queries_file:
+        run_queries_file(args.queries_file, test_mode=args.t)
+        return
+
     # Start interactive mode
     interactive_mode(test_mode=args.t)
 
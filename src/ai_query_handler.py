@@ -1,17 +1,128 @@
+import collections
+import concurrent.futures
+import hashlib
+import itertools
 import json
+import re
+import threading
 import time
-import pip_system_certs.wrapt_requests
 import requests
+from src.json_utils import json_dumps_bytes
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import getpass
 
 
+# Keyword tables for the offline fallback, built once at import
+_PROTOCOL_KWS = ("protocol",)
+_IP_KWS = ("ip", "address")
+
+# Process-wide pooled sessions, one per API key. SessionManager rebuilds
+# its handler whenever the pcap file changes; sharing the Session keeps
+# the warm keep-alive connections (and their TLS handshakes) across those
+# rebuilds instead of starting cold each time.
+_SESSIONS_LOCK = threading.Lock()
+_SESSIONS = {}
+
+
+def _pooled_session(api_key):
+    """Return the shared pooled Session for this API key, creating it once."""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(api_key)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(
+                {
+                    "Authorization": "Bearer " + api_key,
+                    "Content-Type": "application/json",
+                }
+            )
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=["POST", "GET"],
+                ),
+            )
+            session.mount("https://", adapter)
+            _SESSIONS[api_key] = session
+        return session
+
+
+def _direct_total_packets(analysis_data):
+    if "total_packets" in analysis_data:
+        return f"Total packets: {analysis_data['total_packets']}"
+    if "packet_count" in analysis_data:
+        return f"Total packets: {analysis_data['packet_count']}"
+    return None
+
+
+def _direct_protocol_list(analysis_data):
+    protocols = analysis_data.get("protocols")
+    if isinstance(protocols, dict) and protocols:
+        return "Protocols: " + ", ".join(protocols)
+    if analysis_data.get("protocol"):
+        return "Protocols: " + analysis_data["protocol"]
+    return None
+
+
+# Questions whose answers sit verbatim in the analysis data; answering them
+# locally skips an entire LLM round-trip.
+_DIRECT_PATTERNS = [
+    (re.compile(r"\bhow many packets\b", re.IGNORECASE), _direct_total_packets),
+    (
+        re.compile(r"\b(?:list|what|which) (?:the )?protocols\b", re.IGNORECASE),
+        _direct_protocol_list,
+    ),
+]
+
+
 class AIQueryHandler:
+    # Questions matching these are never served from cache (time-sensitive)
+    _CACHE_EXCLUDE = re.compile(r"\b(latest|now|current|today)\b", re.IGNORECASE)
+
     def __init__(self, api_key, test_mode=False):
         self.api_key = api_key
         self.test_mode = test_mode
         self.base_url = "https://llm-proxy-api.ai.eng.netapp.com"
-    
+        if "netapp.com" in self.base_url:
+            # The internal proxy needs requests to trust the system CA
+            # store. Imported lazily (it monkey-patches requests and
+            # enumerates the cert store) and only when actually talking to
+            # the NetApp endpoint. Must happen before the Session below is
+            # created so the patched transport is picked up.
+            import pip_system_certs.wrapt_requests  # noqa: F401
+        self._last_ok_ts = 0.0  # monotonic time of last successful API call
+        self._probe_ttl = 60  # seconds before we re-probe connectivity
+        # Reuse the process-wide pooled session so every call shares
+        # keep-alive connections instead of paying a TLS handshake per
+        # request - even when SessionManager rebuilds this handler.
+        # urllib3's Retry handles backoff (and honors Retry-After on 429s).
+        self.session = _pooled_session(self.api_key)
+        # Exact-match response cache: repeated identical questions against
+        # the same analysis data skip the LLM round-trip entirely.
+        self._response_cache = collections.OrderedDict()
+        self._response_cache_max = 512
+        # Guards the caches below: query_batch runs query() on several
+        # threads, and an unguarded move_to_end racing an eviction raises
+        # KeyError out of an unrelated query.
+        self._cache_lock = threading.Lock()
+        # Serialized analysis blob, cached across turns of a conversation.
+        # One entry only - the session keeps a single analysis_data alive
+        # at a time. Holding the object itself (not just its id) makes the
+        # identity check immune to id reuse after garbage collection.
+        self._ctx_obj = None
+        self._ctx_text = None
+        # Optional second-tier semantic cache (see enable_semantic_cache)
+        self._sem_model = None
+        self._sem_threshold = 0.93
+        self._sem_max = 2048
+        self._sem_entries = {}  # analysis hash -> (list of embeddings, list of responses)
+
     def log_debug(self, message):
         """Print debug messages only in test mode."""
         if self.test_mode:
@@ -28,20 +139,16 @@ class AIQueryHandler:
         return user
 
     def test_connection(self):
-        """Test connectivity to NetApp's internal LLM proxy API."""
-        try:
-            # Test basic internet connectivity
-            response = requests.get("https://www.google.com", timeout=5)
-            self.log_debug("✓ Internet connection: OK")
-        except requests.RequestException:
-            print("✗ Internet connection: FAILED")
-            return False
+        """Test connectivity to NetApp's internal LLM proxy API.
 
+        The result is cached: a successful probe (or a successful real query)
+        refreshes `_last_ok_ts` so `query()` can skip this check for the next
+        `_probe_ttl` seconds.
+        """
         try:
             # Test NetApp LLM proxy API connectivity
-            test_response = requests.post(
+            test_response = self.session.post(
                 f"{self.base_url}/chat/completions",
-                headers={"Authorization": "Bearer " + self.load_your_key()},
                 json={
                     "model": "gpt-4o",
                     "messages": [{"role": "user", "content": "test"}],
@@ -53,6 +160,7 @@ class AIQueryHandler:
 
             if test_response.status_code == 200:
                 self.log_debug("✓ NetApp LLM Proxy API connection: OK")
+                self._last_ok_ts = time.monotonic()
                 return True
             else:
                 print(
@@ -66,161 +174,326 @@ class AIQueryHandler:
             return False
 
     def generate_offline_response(self, user_question, analysis_data):
-        """Generate a basic response using only the analysis data when AI is unavailable."""
+        """Generate a basic response using only the analysis data when AI is unavailable.
+
+        Lowercases the question once and builds the answer with generator
+        joins / islice so the function stays cheap even when called in a
+        tight loop (e.g. a batch falling back while the API is down).
+        """
         protocols = analysis_data.get("protocols", {})
         total_packets = analysis_data.get("total_packets", 0)
         top_ips = analysis_data.get("top_source_ips", {})
+        question = user_question.lower()
 
-        if "protocol" in user_question.lower():
-            protocol_list = list(protocols.keys())
+        if any(kw in question for kw in _PROTOCOL_KWS):
             return (
-                f"Based on the packet analysis, the following protocols were detected in this trace:\n\n"
-                + f"• {', '.join(protocol_list)}\n\n"
-                + f"Protocol distribution:\n"
+                "Based on the packet analysis, the following protocols were detected in this trace:\n\n"
+                + f"• {', '.join(protocols)}\n\n"
+                + "Protocol distribution:\n"
                 + "\n".join(
-                    [
-                        f"• {proto}: {count} packets"
-                        for proto, count in protocols.items()
-                    ]
+                    f"• {proto}: {count} packets" for proto, count in protocols.items()
                 )
                 + f"\n\nTotal packets analyzed: {total_packets}"
             )
 
-        elif "ip" in user_question.lower() or "address" in user_question.lower():
-            ip_list = list(top_ips.keys())[:5]
+        elif any(kw in question for kw in _IP_KWS):
             return (
-                f"Top source IP addresses in this trace:\n\n"
+                "Top source IP addresses in this trace:\n\n"
                 + "\n".join(
-                    [
-                        f"• {ip}: {count} packets"
-                        for ip, count in list(top_ips.items())[:5]
-                    ]
+                    f"• {ip}: {count} packets"
+                    for ip, count in itertools.islice(top_ips.items(), 5)
                 )
                 + f"\n\nTotal packets analyzed: {total_packets}"
             )
 
         else:
             return (
-                f"OFFLINE MODE - AI analysis unavailable.\n\n"
-                + f"Basic packet trace summary:\n"
+                "OFFLINE MODE - AI analysis unavailable.\n\n"
+                + "Basic packet trace summary:\n"
                 + f"• Total packets: {total_packets}\n"
-                + f"• Protocols found: {', '.join(protocols.keys())}\n"
-                + f"• Top source IPs: {', '.join(list(top_ips.keys())[:3])}\n\n"
-                + f"For AI analysis, ensure NetApp LLM proxy access is configured."
+                + f"• Protocols found: {', '.join(protocols)}\n"
+                + f"• Top source IPs: {', '.join(itertools.islice(top_ips, 3))}\n\n"
+                + "For AI analysis, ensure NetApp LLM proxy access is configured."
             )
 
-    def query(self, user_question, analysis_data, conversation_history=None):
-        """Send query to NetApp's LLM proxy API with pcap analysis data and conversation history."""
+    def enable_semantic_cache(self, threshold=0.93):
+        """Turn on the semantic similarity cache tier.
+
+        Paraphrased questions ("what protocols are in this trace?" vs
+        "which protocols appear here?") miss the exact-match cache but can
+        share a response. This tier embeds questions with a local
+        sentence-transformer and returns a cached answer when cosine
+        similarity against a previous question (for the same analysis data)
+        exceeds the threshold. Opt-in because it loads a model at startup;
+        requires the optional sentence-transformers package.
+        """
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            print("⚠️  sentence-transformers not installed; semantic cache unavailable")
+            return False
+
+        self._sem_model = SentenceTransformer("all-MiniLM-L6-v2")
+        self._sem_threshold = threshold
+        return True
+
+    def _semantic_lookup(self, user_question, analysis_hash):
+        """Return a cached response for a similar enough question, or None."""
+        # Snapshot under the lock: _semantic_put mutates these lists from
+        # other batch threads, and an unlocked reader can catch vectors and
+        # responses mid-append (or mid-eviction) out of step.
+        with self._cache_lock:
+            entries = self._sem_entries.get(analysis_hash)
+            if not entries:
+                return None
+            vectors, responses = (list(entries[0]), list(entries[1]))
+        import numpy as np
+
+        query_vec = self._sem_model.encode(
+            user_question.strip().lower(), normalize_embeddings=True
+        )
+        scores = np.asarray(vectors) @ query_vec
+        best = int(scores.argmax())
+        if scores[best] >= self._sem_threshold:
+            self.log_debug(
+                f"✓ Returning cached response (semantic match, score {scores[best]:.3f})"
+            )
+            return responses[best]
+        return None
+
+    def _semantic_put(self, user_question, analysis_hash, response):
+        """Remember a question embedding so future paraphrases can hit."""
+        # Encode outside the lock (it is the expensive part), mutate inside.
+        vector = self._sem_model.encode(
+            user_question.strip().lower(), normalize_embeddings=True
+        )
+        with self._cache_lock:
+            vectors, responses = self._sem_entries.setdefault(analysis_hash, ([], []))
+            if len(vectors) >= self._sem_max:
+                vectors.pop(0)
+                responses.pop(0)
+            vectors.append(vector)
+            responses.append(response)
+
+    def _cache_key(self, user_question, analysis_data):
+        """Build a stable hash for (question, analysis data, model, temperature)."""
+        payload = json_dumps_bytes(
+            {
+                "q": user_question.strip().lower(),
+                "d": analysis_data,
+                "m": "gpt-4o",
+                "t": 0.2,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    def _cache_put(self, key, response):
+        """Store a response under key with LRU eviction."""
+        with self._cache_lock:
+            self._response_cache[key] = response
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > self._response_cache_max:
+                self._response_cache.popitem(last=False)
+
+    # Turns of prior conversation included per request. Without a cap the
+    # prompt (and its serialization cost) grows linearly with session
+    # length, making call N cost O(N) - quadratic across a whole session.
+    CONVERSATION_WINDOW = 20
+
+    def query(self, user_question, analysis_data, conversation_history=None, summary=None):
+        """Send query to NetApp's LLM proxy API with pcap analysis data and conversation history.
+
+        When a precomputed summary card is given it replaces the raw
+        analysis blob in the prompt, keeping input tokens bounded instead
+        of growing with pcap size.
+        """
 
-        self.log_debug("Testing connectivity...")
-        if not self.test_connection():
+        # Trivially factual questions are answered straight from the
+        # analysis data - no network, no tokens.
+        for pattern, handler in _DIRECT_PATTERNS:
+            if pattern.search(user_question):
+                direct = handler(analysis_data)
+                if direct is not None:
+                    self.log_debug("✓ Answered directly from analysis data")
+                    return direct
+
+        # Serve repeated identical questions straight from the cache
+        # (skipped for time-sensitive phrasing and mid-conversation turns,
+        # where prior context can change the answer).
+        cacheable = not conversation_history and not self._CACHE_EXCLUDE.search(
+            user_question
+        )
+        analysis_hash = None
+        if cacheable:
+            cache_key = self._cache_key(user_question, analysis_data)
+            with self._cache_lock:
+                cached = self._response_cache.get(cache_key)
+                if cached is not None:
+                    self._response_cache.move_to_end(cache_key)
+            if cached is not None:
+                self.log_debug("✓ Returning cached response (exact match)")
+                return cached
+            if self._sem_model is not None:
+                analysis_hash = hashlib.sha256(
+                    json_dumps_bytes(analysis_data, sort_keys=True)
+                ).hexdigest()
+                cached = self._semantic_lookup(user_question, analysis_hash)
+                if cached is not None:
+                    return cached
+
+        # Only probe connectivity when we haven't seen a successful API call
+        # recently; each probe costs a full round-trip plus a billed request.
+        if time.monotonic() - self._last_ok_ts > self._probe_ttl:
+            self.log_debug("Testing connectivity...")
+            connected = self.test_connection()
+        else:
+            connected = True
+
+        if not connected:
             print("\n" + "=" * 60)
             print("NETWORK CONNECTIVITY ISSUE DETECTED")
             print("=" * 60)
             print("Falling back to offline analysis mode...")
             print("=" * 60)
 
-            response = self.generate_offline_response(user_question, analysis_data)
-            self.append_to_dataset(user_question, response)
-            return response
+            return self.generate_offline_response(user_question, analysis_data)
+
+        # Prepare context for AI. The summary card is already a string;
+        # without one, the analysis blob is serialized once per object and
+        # reused for every later turn of the conversation (compact form -
+        # fewer bytes on the wire and fewer prompt tokens than json.dumps'
+        # spaced default).
+        if summary:
+            analysis_text = summary
+        else:
+            # Under the lock so concurrent batch threads sharing one
+            # analysis_data serialize it once and the rest reuse the text.
+            with self._cache_lock:
+                if self._ctx_obj is analysis_data:
+                    analysis_text = self._ctx_text
+                else:
+                    analysis_text = json_dumps_bytes(analysis_data).decode("utf-8")
+                    self._ctx_obj = analysis_data
+                    self._ctx_text = analysis_text
 
-        # Prepare context for AI
         context = f"""
 You are an expert network analyst. You have been provided with analysis data from a pcap (packet capture) file.
 The user will ask questions about this network traffic data. Please provide clear, accurate answers in plain English.
 
 Analysis Data:
-{json.dumps(analysis_data)}
+{analysis_text}
 
 Please answer the following question about this network traffic data:
 """
         # Build messages with previous context
         messages = [{"role": "system", "content": context}]
         if conversation_history:
-            for entry in conversation_history:
+            for entry in conversation_history[-self.CONVERSATION_WINDOW:]:
                 messages.append({"role": "user", "content": entry["query"]})
                 messages.append({"role": "assistant", "content": entry["response"]})
         messages.append({"role": "user", "content": user_question})
 
-        # Retry logic
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                self.log_debug(
-                    f"Sending query to NetApp LLM Proxy (attempt {attempt + 1}/{max_retries})..."
-                )
+        # Serialize the body once up front; the session's urllib3 Retry
+        # adapter re-sends these same bytes on transient failures instead of
+        # re-encoding the (potentially large) analysis data per attempt.
+        payload = json_dumps_bytes(
+            {
+                "model": "gpt-4o",
+                "messages": messages,
+                "user": self.detect_user(),
+                "max_tokens": 500,
+                "temperature": 0.2,
+            }
+        )
 
-                response = requests.post(
-                    f"{self.base_url}/chat/completions",
-                    headers={"Authorization": "Bearer " + self.load_your_key()},
-                    json={
-                        "model": "gpt-4o",
-                        "messages": messages,
-                        "user": self.detect_user(),
-                        "max_tokens": 500,
-                        "temperature": 0.2,
-                    },
-                    timeout=30,
-                )
+        try:
+            self.log_debug("Sending query to NetApp LLM Proxy...")
 
-                if response.status_code == 200:
-                    result = response.json()
-                    response_content = result["choices"][0]["message"]["content"].strip()
-                    self.append_to_dataset(user_question, response_content)
-                    return response_content
-                else:
-                    print(f"API error: HTTP {response.status_code}")
-                    print(f"Response: {response.text}")
-                    if attempt == max_retries - 1:
-                        response = self.generate_offline_response(
-                            user_question, analysis_data
+            response = self.session.post(
+                f"{self.base_url}/chat/completions",
+                data=payload,
+                timeout=30,
+            )
+
+            if response.status_code == 200:
+                self._last_ok_ts = time.monotonic()
+                result = response.json()
+                response_content = result["choices"][0]["message"]["content"].strip()
+                if cacheable:
+                    self._cache_put(cache_key, response_content)
+                    if self._sem_model is not None:
+                        self._semantic_put(
+                            user_question, analysis_hash, response_content
                         )
-                        self.append_to_dataset(user_question, response)
-                        return response
-
-            except requests.RequestException as e:
-                print(f"Connection error on attempt {attempt + 1}: {e}")
-                if attempt < max_retries - 1:
-                    print("Retrying in 2 seconds...")
-                    time.sleep(2)
-                else:
-                    print(
-                        "Failed to connect to NetApp LLM Proxy. Switching to offline mode..."
-                    )
-                    response = self.generate_offline_response(user_question, analysis_data)
-                    self.append_to_dataset(user_question, response)
-                    return response
-
-            except Exception as e:
-                print(f"Unexpected error: {e}. Switching to offline mode...")
-                response = self.generate_offline_response(user_question, analysis_data)
-                self.append_to_dataset(user_question, response)
-                return response
-
-        response = self.generate_offline_response(user_question, analysis_data)
-        self.append_to_dataset(user_question, response)
-        return response
+                return response_content
+
+            print(f"API error: HTTP {response.status_code}")
+            print(f"Response: {response.text}")
+
+        except requests.RequestException as e:
+            print(f"Connection error: {e}")
+            print("Failed to connect to NetApp LLM Proxy. Switching to offline mode...")
+
+        except Exception as e:
+            print(f"Unexpected error: {e}. Switching to offline mode...")
+
+        return self.generate_offline_response(user_question, analysis_data)
+
+    def query_batch(self, questions, analysis_data, conversation_history=None, max_workers=8, summary=None):
+        """Run several independent questions concurrently against the same analysis data.
+
+        Each question is dispatched on its own thread over the shared pooled
+        session, so total wall time approaches the slowest single round-trip
+        instead of the sum of all of them. Results are returned in the same
+        order as the input questions.
+        """
+        if not questions:
+            return []
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_workers, len(questions))
+        ) as pool:
+            futures = [
+                pool.submit(self.query, q, analysis_data, conversation_history, summary)
+                for q in questions
+            ]
+            return [f.result() for f in futures]
+
+    @staticmethod
+    def iter_dataset(dataset_file="dataset.jsonl"):
+        """Yield dataset entries one at a time without loading the whole file.
+
+        Readers of the append-only dataset should use this instead of
+        slurping the file: memory stays O(1) no matter how large the
+        dataset grows. Malformed lines (e.g. from an interrupted write)
+        are skipped.
+        """
+        if not os.path.exists(dataset_file):
+            return
+        with open(dataset_file, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
 
     def append_to_dataset(self, user_question, response):
-        """Append the query and response to a JSON file."""
+        """Append the query and response to the dataset as one JSON line.
+
+        Appending a single line keeps the cost O(1) per query instead of
+        re-reading and rewriting the whole dataset file every time.
+        """
         self.log_debug("Appending to dataset...")
-        dataset_file = "dataset.json"
+        dataset_file = "dataset.jsonl"
         entry = {"question": user_question, "response": response}
 
         try:
-            if os.path.exists(dataset_file):
-                with open(dataset_file, "r") as file:
-                    data = json.load(file)
-            else:
-                data = []
-
-            data.append(entry)
-
-            try:
-                with open(dataset_file, "w") as file:
-                    self.log_debug(f"Appending to dataset file: {dataset_file}")
-                    json.dump(data, file, indent=4)
-            except Exception as e:
-                print(f"Error writing to dataset.json: {e}")
+            with open(dataset_file, "ab") as file:
+                self.log_debug(f"Appending to dataset file: {dataset_file}")
+                file.write(json_dumps_bytes(entry) + b"\n")
         except Exception as e:
             print(f"Failed to append to dataset file: {e}")
@@ -0,0 +1,34 @@
+"""
+JSON helpers for pcapAI - use orjson when installed, stdlib json otherwise.
+
+orjson encodes/decodes several times faster than the stdlib and produces
+bytes directly, which matters for the history/dataset files that grow with
+every query. It stays optional: everything degrades to stdlib json.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps_bytes(obj, indent=False, sort_keys=False):
+    """Serialize obj to UTF-8 JSON bytes."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option, default=str)
+    if indent:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys, default=str).encode("utf-8")
+    return json.dumps(
+        obj, separators=(",", ":"), sort_keys=sort_keys, default=str
+    ).encode("utf-8")
+
+
+def json_loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
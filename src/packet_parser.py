@@ -1,4 +1,3 @@
-import pyshark
 import json
 from datetime import datetime
 from typing import Dict, List, Any, Optional
@@ -322,26 +321,35 @@ class PacketParser:
 
         return generic_data
 
-    def parse_packets_to_json(self, packets: List) -> str:
+    def iter_parsed(self, packets):
         """
-        Parse a list of packets and return JSON string.
+        Lazily parse an iterable of packets, yielding one dict at a time.
+
+        Holding only the packet currently being parsed keeps memory flat
+        no matter how large the capture is.
 
         Args:
-            packets: List of pyshark packet objects
+            packets: Iterable of pyshark packet objects
 
-        Returns:
-            JSON string containing parsed packets
+        Yields:
+            Dictionary per packet (or an error record for unparsable ones)
         """
-        parsed_packets = []
-
         for i, packet in enumerate(packets):
             try:
                 parsed_packet = self.parse_packet(packet)
                 parsed_packet["packet_index"] = i
-                parsed_packets.append(parsed_packet)
+                yield parsed_packet
             except Exception as e:
-                parsed_packets.append(
-                    {"packet_index": i, "error": f"Failed to parse packet: {str(e)}"}
-                )
+                yield {"packet_index": i, "error": f"Failed to parse packet: {str(e)}"}
+
+    def parse_packets_to_json(self, packets: List) -> str:
+        """
+        Parse a list of packets and return JSON string.
+
+        Args:
+            packets: Iterable of pyshark packet objects
 
-        return json.dumps(parsed_packets, default=str)
+        Returns:
+            JSON string containing parsed packets
+        """
+        return json.dumps(list(self.iter_parsed(packets)), default=str)
@@ -1,53 +1,127 @@
-import pyshark
+import os
+
 from collections import defaultdict, Counter
-import json
+from src.json_utils import json_dumps_bytes
 from src.packet_parser import PacketParser
 
 
+def _prefetch_file(path):
+    """Ask the kernel to start reading the file into the page cache.
+
+    The page cache is shared across processes, so the tshark child that
+    pyshark spawns finds the capture's pages already warm instead of
+    faulting them in 4 KiB at a time. Advisory only; silently skipped on
+    platforms without posix_fadvise.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except (AttributeError, OSError):
+        pass
+    finally:
+        os.close(fd)
+
+
 class PcapAnalyzer:
     def __init__(self, pcap_file):
         self.pcap_file = pcap_file
         self.packets = []
         self.analysis = {}
+        self.protocols = []  # optional protocol focus, see set_protocols
 
-    def parse_pcap(self) -> str:
+    def set_protocols(self, protocols):
+        """Limit tshark dissection to the given protocols (plus base layers)."""
+        self.protocols = [p.lower() for p in protocols] if protocols else []
+
+    def _open_capture(self):
+        """Open a FileCapture in JSON mode.
+
+        tshark's JSON output is roughly an order of magnitude faster to
+        produce and parse than the default XML/PDML. When a protocol focus
+        is set, a -j hint trims dissection to the base layers plus the
+        focus protocols; unfiltered captures get the full tree so the
+        parser sees every layer it supports.
+        """
+        # Imported here so light CLI paths (--status, --clear-history)
+        # never pay pyshark's import cost.
+        import pyshark
+
+        _prefetch_file(self.pcap_file)
+        kwargs = {
+            "use_json": True,
+            "include_raw": False,
+            "keep_packets": False,
+        }
+        if self.protocols:
+            # Push the protocol filter down into tshark (-Y) so frames that
+            # don't match never cross the subprocess pipe at all, and trim
+            # dissection to base layers plus the focus protocols.
+            kwargs["display_filter"] = " or ".join(self.protocols)
+            dissect = ["frame", "eth", "ip", "tcp", "udp"] + self.protocols
+            kwargs["custom_parameters"] = {"-j": " ".join(dissect)}
+        return pyshark.FileCapture(self.pcap_file, **kwargs)
+
+    def iter_packets(self):
+        """Yield one parsed packet dict at a time.
+
+        Combined with keep_packets=False this streams the capture: only the
+        packet being parsed is resident, so memory stays flat regardless of
+        pcap size.
+        """
         parser = PacketParser()
-        cap = pyshark.FileCapture(self.pcap_file)
-        packets = list(cap)
-        cap.close()
-        parsed_json_packets = parser.parse_packets_to_json(packets)
-        # save first 2 parsed json packets in sample_data.json
-        with open("sample_data.json", "w") as f:
-            json.dump(parsed_json_packets[:2], f, indent=2)
-        return parsed_json_packets
+        cap = self._open_capture()
+        try:
+            yield from parser.iter_parsed(cap)
+        finally:
+            cap.close()
+
+    def parse_pcap(self) -> str:
+        parsed_packets = list(self.iter_packets())
+        # save first 2 parsed packets in sample_data.json
+        with open("sample_data.json", "wb") as f:
+            f.write(json_dumps_bytes(parsed_packets[:2], indent=True))
+        return json_dumps_bytes(parsed_packets).decode("utf-8")
 
     def analyze(self):
         """Analyze the pcap file and extract relevant information."""
         print("Loading and analyzing pcap file...")
         
         try:
-            cap = pyshark.FileCapture(self.pcap_file)
-            
+            cap = self._open_capture()
+
             protocols = Counter()
             src_ips = Counter()
             dst_ips = Counter()
             src_ports = Counter()
             dst_ports = Counter()
-            packet_sizes = []
-            
+            # Running size aggregates - no per-packet list to grow and rescan
+            size_count = 0
+            size_total = 0
+            size_min = None
+            size_max = None
+
             packet_count = 0
             for packet in cap:
                 packet_count += 1
-                
+
                 # Extract protocols
                 for layer in packet.layers:
                     protocols[layer.layer_name] += 1
-                
+
                 # Extract IP information if available
                 if hasattr(packet, 'ip'):
                     src_ips[packet.ip.src] += 1
                     dst_ips[packet.ip.dst] += 1
-                    packet_sizes.append(int(packet.length))
+                    length = int(packet.length)
+                    size_count += 1
+                    size_total += length
+                    if size_min is None or length < size_min:
+                        size_min = length
+                    if size_max is None or length > size_max:
+                        size_max = length
                 
                 # Extract port information if available
                 if hasattr(packet, 'tcp'):
@@ -67,9 +141,9 @@ class PcapAnalyzer:
                 'top_destination_ips': dict(dst_ips.most_common(10)),
                 'top_source_ports': dict(src_ports.most_common(10)),
                 'top_destination_ports': dict(dst_ports.most_common(10)),
-                'avg_packet_size': sum(packet_sizes) / len(packet_sizes) if packet_sizes else 0,
-                'min_packet_size': min(packet_sizes) if packet_sizes else 0,
-                'max_packet_size': max(packet_sizes) if packet_sizes else 0
+                'avg_packet_size': size_total / size_count if size_count else 0,
+                'min_packet_size': size_min if size_min is not None else 0,
+                'max_packet_size': size_max if size_max is not None else 0
             }
             
             print(f"Analysis complete. Processed {packet_count} packets.")
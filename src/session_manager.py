@@ -1,52 +1,105 @@
 """
-Session Maprotocol_classes = {
-    "NFS": NFSProtocol(),
-    "SMB": SMBProtocol(),
-    "SMB2": SMBProtocol(),  # SMB2 uses the same handler as SMB
-    "HTTP": HTTPProtocol(),
-    # Add more as needed
-}for pcapAI - Manages session data, history, and AI handler caching
+Session Manager for pcapAI - Manages session data, history, and AI handler caching
 """
+import functools
+import glob
+import hashlib
 import json
 import pickle
+import pickletools
+import threading
 import uuid
 import getpass
 import os
-from src.pcap_analyzer import PcapAnalyzer
-from src.ai_query_handler import AIQueryHandler
-from src.tool_calling_handler import ToolCallingHandler
+from datetime import datetime
+try:
+    # Optional, like orjson in json_utils: zstd shrinks the parsed-data
+    # sidecar several-fold (JSON text is highly repetitive) and decodes
+    # at GB/s, so warm starts read far fewer bytes off disk.
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from src.json_utils import json_dumps_bytes, json_loads
 from src.protocols.nfs import NFSProtocol
 from src.protocols.smb import SMBProtocol
 from src.protocols.http import HTTPProtocol
 
 protocol_classes = {
-    "NFS": NFSProtocol(),
-    "SMB2": SMBProtocol(),
-    "HTTP": HTTPProtocol(),
+    "NFS": NFSProtocol,
+    "SMB2": SMBProtocol,
+    "HTTP": HTTPProtocol,
     # Add more as needed
 }
 
 
+@functools.lru_cache(maxsize=None)
+def get_protocol_handler(name):
+    """Build the handler for a protocol on first use, then reuse it.
+
+    Importing this module no longer constructs every handler up front;
+    only the protocol the session actually filters on pays its setup.
+    """
+    factory = protocol_classes.get(name)
+    return factory() if factory else None
+
+
+def _atomic_write_bytes(path, data):
+    """Write data to path atomically via a temp file and os.replace.
+
+    A crash mid-write leaves the old file intact instead of a truncated,
+    unreadable one.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
 class SessionManager:
     """Manages session data for OpenAI key, pcap file, parsed data, history, and dataset."""
     def __init__(self, test_mode=False):
         self.test_mode = test_mode  # Store the mode for verbose output control
         self.openai_key = None
         self.pcap_file = None
-        self.parsed_data = None
+        self._parsed_data = None
+        self._parsed_packets = None  # parsed_data decoded to objects, lazily
         self.pcap_analyzer = None
         self.ai_handler = None  # Cache AI handler
-        self.filtered_packets = None  # Cache filtered packets
-        self.analysis_data = None  # Cache analysis data
+        self._filtered_packets = None  # Cache filtered packets
+        self._analysis_data = None  # Cache analysis data
+        self.analysis_summary = None  # Compact prompt card built from analysis data
+        self._section_files = {}  # On-disk sections backing the lazy properties
+        self._dirty_sections = set()  # Sections changed since last cache write
+        # (pcap_file, protocols) -> (filtered, analysis, summary): switching
+        # the filter back to a protocol already computed this session is free
+        self._analysis_cache = {}
         self.last_protocols = []  # Track current protocol filter
-        self.session_file = "session_data.pkl"
-        self.history_file = ".cache/history.json"
-        self.dataset_file = "dataset.json" 
+        self.pending_queries = []  # Queued questions for batched LLM calls
+        # Parsing runs on a background thread so the REPL stays responsive;
+        # consumers block on this event only when they need the result.
+        self._parse_done = threading.Event()
+        self._parse_done.set()
+        self._parse_error = None
+        self.session_file = "session_manifest.json"
+        self._pending_cache_path = None  # parse cache to lazy-load on first use
+        self.history_file = ".cache/history.jsonl"
+        self.dataset_file = "dataset.jsonl"
+        self.stats_file = ".cache/stats.json"
         self.history = []
         self.dataset = []
         self.conversation_history = []  # <-- add this for AI context
         self.session_id = str(uuid.uuid4())  # Generate a unique session ID
         self.user_details = self.get_user_details()  # Capture user details
+        # Running feedback counters, kept up to date incrementally so
+        # statistics never require rescanning the whole history.
+        self.feedback_stats = {
+            "total_queries": 0,
+            "rated": 0,
+            "satisfied": 0,
+            "neutral": 0,
+            "unsatisfied": 0,
+        }
         self.load_session()
         self.load_history_and_dataset()
 
@@ -84,29 +137,118 @@ class SessionManager:
         if self.test_mode:
             print(message)
 
+    # The heavy parse products live in per-section cache files; these
+    # properties fault a section in from disk on first access, so a warm
+    # start only reads the sections the current code path actually touches.
+    @property
+    def parsed_data(self):
+        if self._parsed_data is None:
+            self._fault_section("parsed_data")
+        return self._parsed_data
+
+    @parsed_data.setter
+    def parsed_data(self, value):
+        self._parsed_data = value
+        self._parsed_packets = None  # decoded view follows the raw text
+        if value is not None:
+            self._dirty_sections.add("parsed_data")
+
+    @property
+    def filtered_packets(self):
+        if self._filtered_packets is None:
+            self._fault_section("filtered_packets")
+        return self._filtered_packets
+
+    @filtered_packets.setter
+    def filtered_packets(self, value):
+        self._filtered_packets = value
+        if value is not None:
+            self._dirty_sections.add("filtered_packets")
+
+    @property
+    def analysis_data(self):
+        if self._analysis_data is None:
+            self._fault_section("analysis_data")
+        return self._analysis_data
+
+    @analysis_data.setter
+    def analysis_data(self, value):
+        self._analysis_data = value
+        if value is not None:
+            self._dirty_sections.add("analysis_data")
+
+    def _fault_section(self, name):
+        """Load one cache section from disk into its backing attribute."""
+        path = self._section_files.get(name)
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path, "rb", buffering=self.PARSE_CACHE_IO_BUFFER) as f:
+                if path.endswith(".json.zst"):
+                    raw = zstandard.ZstdDecompressor().decompress(f.read())
+                    setattr(self, "_" + name, raw.decode("utf-8"))
+                elif path.endswith(".json"):
+                    # parsed_data is stored as the raw JSON text it already
+                    # is in memory - one read + decode, no unpickling.
+                    setattr(self, "_" + name, f.read().decode("utf-8"))
+                else:
+                    setattr(self, "_" + name, pickle.load(f))
+            self.log_debug(f"✓ Loaded {name} from cache")
+        except Exception as e:
+            self.log_debug(f"⚠️  Could not load {name} from cache: {e}")
+
     def load_session(self):
-        """Load session data from file if it exists."""
+        """Load the session manifest if it exists.
+
+        The manifest is a few hundred bytes of JSON - key, pcap path and a
+        fingerprinted pointer to the parsed-data sidecar - so startup cost
+        is O(manifest). The heavy parse result is only read from its
+        sidecar when a query first needs it (see _ensure_parsed_data).
+        """
         try:
             if os.path.exists(self.session_file):
-                with open(self.session_file, 'rb') as f:
-                    data = pickle.load(f)
-                    self.openai_key = data.get('openai_key')
-                    self.pcap_file = data.get('pcap_file')
-                    self.parsed_data = data.get('parsed_data')
+                with open(self.session_file, "rb") as f:
+                    manifest = json_loads(f.read())
+                self.openai_key = manifest.get("openai_key")
+                self.pcap_file = manifest.get("pcap_file")
+                cache_path = manifest.get("parsed_cache_path")
+                # Only trust the sidecar if the pcap is unchanged
+                if (
+                    cache_path
+                    and os.path.exists(cache_path)
+                    and self.pcap_file
+                    and os.path.exists(self.pcap_file)
+                ):
+                    st = os.stat(self.pcap_file)
+                    if st.st_size == manifest.get("pcap_size") and st.st_mtime == manifest.get("pcap_mtime"):
+                        self._pending_cache_path = cache_path
                 self.log_debug("✓ Previous session loaded successfully")
+            elif os.path.exists("session_data.pkl"):
+                # Legacy pickled session (pre-manifest) - migrate once
+                with open("session_data.pkl", "rb") as f:
+                    data = pickle.load(f)
+                self.openai_key = data.get("openai_key")
+                self.pcap_file = data.get("pcap_file")
+                self.parsed_data = data.get("parsed_data")
+                self.save_session()
+                os.remove("session_data.pkl")
+                self.log_debug("✓ Migrated legacy session to manifest")
         except Exception as e:
             print(f"⚠️  Could not load previous session: {e}")
 
     def save_session(self):
-        """Save current session data to file."""
+        """Write the session manifest (the parse sidecar is written separately)."""
         try:
-            data = {
-                'openai_key': self.openai_key,
-                'pcap_file': self.pcap_file,
-                'parsed_data': self.parsed_data
+            manifest = {
+                "openai_key": self.openai_key,
+                "pcap_file": self.pcap_file,
             }
-            with open(self.session_file, 'wb') as f:
-                pickle.dump(data, f)
+            if self.pcap_file and os.path.exists(self.pcap_file):
+                st = os.stat(self.pcap_file)
+                manifest["pcap_size"] = st.st_size
+                manifest["pcap_mtime"] = st.st_mtime
+                manifest["parsed_cache_path"] = self._parse_cache_path(self.pcap_file)
+            _atomic_write_bytes(self.session_file, json_dumps_bytes(manifest, indent=True))
             self.log_debug("✓ Session saved successfully")
         except Exception as e:
             print(f"⚠️  Could not save session: {e}")
@@ -120,10 +262,17 @@ class SessionManager:
         # self.ai_handler = None  # Clear cached AI handler
         self.filtered_packets = None  # Clear cached filtered packets
         self.analysis_data = None  # Clear cached analysis data
+        self.analysis_summary = None  # Clear cached prompt card
         self.last_protocols = []  # Clear protocol filter
+        self._pending_cache_path = None
+        self._section_files = {}
+        self._analysis_cache = {}
         try:
-            if os.path.exists(self.session_file):
-                os.remove(self.session_file)
+            for stale in (self.session_file, "session_data.pkl"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            for path in glob.glob(os.path.join(".cache", "parsed_*")):
+                os.remove(path)
             self.log_debug("✓ Session cleared successfully")
         except Exception as e:
             print(f"⚠️  Could not clear session file: {e}")
@@ -131,21 +280,36 @@ class SessionManager:
     def set_openai_key(self, key_file):
         """Set OpenAI API key and initialize AI handler."""
         try:
-            with open(key_file, 'r') as f:
-                self.openai_key = f.read().strip()
-                # Initialize AI handler once when key is set
-                self._initialize_ai_handler(test_mode=self.test_mode)
-                self.log_debug("✓ OpenAI key loaded successfully")
-                self.save_session()
+            # Keys are short ASCII tokens; a bounded binary read keeps a
+            # mistyped path to some huge file from being slurped whole.
+            with open(key_file, "rb") as f:
+                raw = f.read(256)
+            key = raw.decode("ascii").strip()
+            if not key or len(key) > 200:
+                print(f"Error: '{key_file}' does not look like an API key file.")
+                return False
+            self.openai_key = key
+            # Initialize AI handler once when key is set
+            self._initialize_ai_handler(test_mode=self.test_mode)
+            self.log_debug("✓ OpenAI key loaded successfully")
+            self.save_session()
         except FileNotFoundError:
             print(f"Error: OpenAI key file '{key_file}' not found.")
             return False
+        except UnicodeDecodeError:
+            print(f"Error: '{key_file}' is not a text key file.")
+            return False
         return True
 
     def _initialize_ai_handler(self, test_mode=None):
         """Initialize AI handler once when we have the key. Choose handler based on PCAP file size."""
         if self.openai_key:
             try:
+                # Deferred: the handler modules pull in requests (and the
+                # cert-store patch), which light CLI paths never need.
+                from src.ai_query_handler import AIQueryHandler
+                from src.tool_calling_handler import ToolCallingHandler
+
                 # Check if we have a PCAP file and get its size
                 file_size_kb = 0
                 handler_type = "standard"
@@ -168,7 +332,14 @@ class SessionManager:
                     print("🔧 Initializing standard AI handler (no PCAP file yet)...")
                     self.ai_handler = AIQueryHandler(self.openai_key, test_mode=test_mode or self.test_mode)
                     print("✓ Standard AI handler initialized and cached for session")
-                    
+
+                # Opt-in semantic response cache (loads a local embedding
+                # model, so never on by default).
+                if os.environ.get("PCAPAI_SEMANTIC_CACHE") and hasattr(
+                    self.ai_handler, "enable_semantic_cache"
+                ):
+                    self.ai_handler.enable_semantic_cache()
+
             except Exception as e:
                 print(f"⚠️  Error initializing AI handler: {e}")
                 self.ai_handler = None
@@ -179,8 +350,20 @@ class SessionManager:
             print("✓ Using cached filtered packets (protocol unchanged)")
             return True
 
+        cache_key = (self.pcap_file, tuple(protocols))
+        cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            self.filtered_packets, self.analysis_data, self.analysis_summary = cached
+            self.last_protocols = protocols
+            print("✓ Using memoized filtered packets (protocol seen this session)")
+            return True
+
         self.last_protocols = protocols
 
+        # A background parse may still be running - filtering needs the
+        # complete packet set, so this is where overlap ends.
+        self._ensure_parsed_data()
+
         if not self.parsed_data:
             print("❌ No PCAP data available to filter")
             return False
@@ -188,11 +371,7 @@ class SessionManager:
         try:
             print(f"🔄 Filtering packets for protocol(s): {protocols}")
 
-            # Parse the data if it's a string
-            if isinstance(self.parsed_data, str):
-                parsed_data = json.loads(self.parsed_data)
-            else:
-                parsed_data = self.parsed_data
+            parsed_data = self.get_parsed_packets()
 
             packets = (
                 parsed_data
@@ -202,8 +381,25 @@ class SessionManager:
 
             if protocols:
                 proto_name = protocols[0]  # Use first protocol
-                proto_handler = protocol_classes.get(proto_name)
-                if proto_handler:
+                proto_handler = get_protocol_handler(proto_name)
+                if (
+                    self.pcap_analyzer is not None
+                    and self.pcap_analyzer.protocols
+                    == [p.lower() for p in protocols]
+                ):
+                    # The parse already ran with this protocol pushed into
+                    # tshark's display filter, so the parsed packets are the
+                    # filtered set - no second capture pass needed.
+                    self.filtered_packets = packets
+                    self.analysis_data = {
+                        "protocol": proto_name,
+                        "packet_count": len(packets),
+                        "packets": packets,
+                    }
+                    print(
+                        f"✓ Reusing tshark-filtered parse: {len(packets)} {proto_name} packets"
+                    )
+                elif proto_handler:
                     self.filtered_packets = proto_handler.filter_packets(self.pcap_file)
                     self.analysis_data = proto_handler.analyze(self.filtered_packets)
                     print(
@@ -222,12 +418,81 @@ class SessionManager:
                     f"✓ Using all {len(self.filtered_packets)} packets (no protocol filter)"
                 )
 
+            # Build the compact prompt card once per filter change; every
+            # query reuses it instead of re-serializing the packet list.
+            self.analysis_summary = self._build_analysis_summary(self.analysis_data)
+            # Persist the filtered view and card beside the parse cache so
+            # a warm start skips this whole pass, not just the tshark parse.
+            self._store_parse_cache()
+            self._analysis_cache[cache_key] = (
+                self._filtered_packets,
+                self._analysis_data,
+                self.analysis_summary,
+            )
             return True
 
         except Exception as e:
             print(f"❌ Error filtering packets: {e}")
             return False
 
+    ANALYSIS_SUMMARY_SAMPLE = 20  # packets included verbatim in the prompt card
+
+    def _build_analysis_summary(self, analysis_data):
+        """Format a compact Markdown summary card of the analysis data.
+
+        The raw analysis blob grows with the capture and would be re-sent
+        to the LLM on every query. This card keeps the prompt bounded: all
+        the aggregates, plus a small sample of packets for concrete detail.
+        """
+        if not isinstance(analysis_data, dict):
+            return None
+
+        lines = ["### Packet analysis summary"]
+        if analysis_data.get("protocol"):
+            lines.append(f"- Protocol filter: {analysis_data['protocol']}")
+        if "total_packets" in analysis_data:
+            lines.append(f"- Total packets: {analysis_data['total_packets']}")
+        elif "packet_count" in analysis_data:
+            lines.append(f"- Total packets: {analysis_data['packet_count']}")
+
+        protocols = analysis_data.get("protocols")
+        if isinstance(protocols, dict) and protocols:
+            lines.append(
+                "- Protocols: "
+                + ", ".join(f"{p} ({c} pkts)" for p, c in protocols.items())
+            )
+
+        for key, label in (
+            ("top_source_ips", "Top source IPs"),
+            ("top_destination_ips", "Top destination IPs"),
+            ("top_source_ports", "Top source ports"),
+            ("top_destination_ports", "Top destination ports"),
+        ):
+            values = analysis_data.get(key)
+            if isinstance(values, dict) and values:
+                lines.append(
+                    f"- {label}: "
+                    + ", ".join(f"{v} ({c})" for v, c in list(values.items())[:10])
+                )
+
+        if "avg_packet_size" in analysis_data:
+            lines.append(
+                f"- Packet size avg/min/max: {analysis_data['avg_packet_size']:.1f}/"
+                f"{analysis_data.get('min_packet_size', 0)}/"
+                f"{analysis_data.get('max_packet_size', 0)} bytes"
+            )
+
+        packets = analysis_data.get("packets")
+        if isinstance(packets, list) and packets:
+            sample = packets[: self.ANALYSIS_SUMMARY_SAMPLE]
+            lines.append(f"- Packets captured: {len(packets)}")
+            lines.append(
+                f"\nSample packets (first {len(sample)} of {len(packets)}):"
+            )
+            lines.append(json.dumps(sample, default=str))
+
+        return "\n".join(lines)
+
     def get_ai_handler(self):
         """Get the cached AI handler."""
         if not self.ai_handler and self.openai_key:
@@ -238,45 +503,289 @@ class SessionManager:
         """Get the cached filtered packets and analysis data."""
         return self.filtered_packets, self.analysis_data
 
+    PARSE_CACHE_MAX_BYTES = 1 << 30  # keep at most ~1 GB of parse caches
+
+    def _parse_cache_path(self, pcap_file):
+        """Cache file for this (pcap fingerprint, protocol filter) combination.
+
+        Keyed on (size, mtime_ns, head hash) rather than the path, so
+        re-selecting the same capture - or a renamed one - hits the cache
+        of the earlier parse, while overwriting a file in place correctly
+        misses. The blake2b of the first 4 KiB costs one small read and
+        ties the key to actual content, not just stat metadata.
+        """
+        try:
+            st = os.stat(pcap_file)
+            with open(pcap_file, "rb") as f:
+                head = hashlib.blake2b(f.read(4096), digest_size=8).hexdigest()
+        except OSError:
+            return None
+        raw = f"{st.st_size}:{st.st_mtime_ns}:{head}:{','.join(sorted(self.last_protocols))}"
+        key = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        return os.path.join(".cache", f"parsed_{key}.pkl")
+
+    def _evict_parse_cache(self):
+        """Drop the oldest parse caches once the total size exceeds the cap.
+
+        A cache is its index plus its section files; grouping them by key
+        and evicting whole groups keeps an index from outliving the
+        sections it points to (sections are written before the index, so
+        per-file LRU would evict the huge parsed_data section first and
+        leave a live index behind).
+        """
+        groups = {}
+        for path in glob.glob(os.path.join(".cache", "parsed_*")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            key = os.path.basename(path).split(".", 1)[0]
+            mtime, size, paths = groups.get(key, (0.0, 0, []))
+            groups[key] = (max(mtime, st.st_mtime), size + st.st_size, paths + [path])
+        total = sum(size for _, size, _ in groups.values())
+        for _, size, paths in sorted(groups.values()):
+            if total <= self.PARSE_CACHE_MAX_BYTES:
+                break
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+
+    _CACHE_SECTIONS = ("parsed_data", "filtered_packets", "analysis_data")
+
+    def _dump_optimized(self, path, obj):
+        """Write one optimized HIGHEST_PROTOCOL pickle.
+
+        pickletools.optimize strips redundant PUT opcodes, shrinking the
+        file and speeding up every later load for a one-off dump cost.
+        """
+        buf = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(path, "wb") as f:
+            f.write(pickletools.optimize(buf))
+
+    def _store_parse_cache(self):
+        """Write the parse cache: one file per heavy section plus an index.
+
+        Everything derived from (pcap, protocol filter) is memoized, but
+        each section lives in its own file so a warm start can fault in
+        just the sections a code path touches - the prompt card rides in
+        the index and never drags the packet list along.
+
+        Only sections that changed since the last write are re-encoded: a
+        filter change renames the cache key, so the new index re-points at
+        the clean sections' existing files (re-dumping only the small
+        filtered view and analysis) instead of rewriting the untouched
+        multi-GB parsed_data blob under the new name.
+        """
+        cache_path = self._parse_cache_path(self.pcap_file) if self.pcap_file else None
+        if not cache_path:
+            return
+        try:
+            section_files = {}
+            for name in self._CACHE_SECTIONS:
+                value = getattr(self, "_" + name)
+                if value is None:
+                    continue
+                # parsed_data is already a JSON string, so its section is
+                # the raw UTF-8 text - pickling a str would only wrap the
+                # same bytes in opcodes and force an unpickle on load.
+                as_text = isinstance(value, str)
+                if as_text:
+                    ext = "json.zst" if zstandard is not None else "json"
+                else:
+                    ext = "pkl"
+                path = f"{cache_path[:-4]}.{name}.{ext}"
+                existing = self._section_files.get(name)
+                if (
+                    name not in self._dirty_sections
+                    and existing
+                    and os.path.exists(existing)
+                ):
+                    # Unchanged since the last dump - reference the file it
+                    # already lives in, even when a filter change moved the
+                    # index to a new key. The utime keeps the shared file
+                    # fresh in the eviction's LRU ordering.
+                    section_files[name] = existing
+                    try:
+                        os.utime(existing)
+                    except OSError:
+                        pass
+                    continue
+                if as_text:
+                    payload = value.encode("utf-8")
+                    if zstandard is not None:
+                        payload = zstandard.ZstdCompressor(level=3).compress(payload)
+                    with open(path, "wb") as f:
+                        f.write(payload)
+                else:
+                    self._dump_optimized(path, value)
+                section_files[name] = path
+            index = {
+                "analysis_summary": self.analysis_summary,
+                "section_files": section_files,
+            }
+            self._dump_optimized(cache_path, index)
+            self._section_files.update(section_files)
+            self._dirty_sections.clear()
+            self._evict_parse_cache()
+        except Exception as e:
+            self.log_debug(f"⚠️  Could not write parse cache: {e}")
+
     def set_pcap_file(self, pcap_file):
         """Set pcap file path and parse it."""
-        if self.pcap_file == pcap_file and self.parsed_data is not None:
+        if self.pcap_file == pcap_file and (
+            self._parsed_data is not None
+            # The section index only counts while its parsed_data file is
+            # still on disk - eviction may have removed it since the load.
+            or os.path.exists(self._section_files.get("parsed_data") or "")
+            or self._pending_cache_path
+        ):
             self.log_debug("✓ Using cached pcap data (already parsed)")
             return True
-        
+
+        # Deferred import: --status/--clear/key-only runs construct a
+        # SessionManager but never parse, so they skip this module entirely.
+        from src.pcap_analyzer import PcapAnalyzer
+
         self.pcap_file = pcap_file
         self.pcap_analyzer = PcapAnalyzer(pcap_file)
-        
+        # Keep tshark's dissection focused on the session's protocols
+        self.pcap_analyzer.set_protocols(self.last_protocols)
+
+        # Warm runs skip tshark entirely: parses are memoized on disk keyed
+        # by pcap path, mtime and the active protocol filter.
+        cache_path = self._parse_cache_path(pcap_file)
+        if cache_path and os.path.exists(cache_path):
+            if self._load_parsed_cache(cache_path):
+                self.log_debug("✓ Loaded parsed pcap data from cache")
+                if self.openai_key:
+                    self.ai_handler = None
+                    self._initialize_ai_handler()
+                self.save_session()
+                return True
+
         print(f"📊 Parsing pcap file: {pcap_file}")
-        print("⏳ This may take a moment for large files...")
-        
+        print("⏳ Parsing in the background - you can keep using the prompt...")
+
+        # A new parse invalidates any previously filtered view
+        self.parsed_data = None
+        self.filtered_packets = None
+        self.analysis_data = None
+        self.analysis_summary = None
+        self._section_files = {}
+        self._analysis_cache = {}
+
+        # Overlap pyshark's subprocess I/O with the user typing their
+        # question (and any LLM setup); queries block in wait_for_parse
+        # only for whatever parse time is still left by then.
+        self._parse_error = None
+        self._parse_done.clear()
+        worker = threading.Thread(target=self._parse_worker, daemon=True)
+        worker.start()
+        return True
+
+    def _parse_worker(self):
+        """Background half of set_pcap_file: parse, cache, refresh handler."""
         try:
             self.parsed_data = self.pcap_analyzer.parse_pcap()
             self.log_debug("✓ Pcap file parsed successfully and cached for session")
-            
+            self._store_parse_cache()
+
             # Reinitialize AI handler based on new file size
             if self.openai_key:
                 self.ai_handler = None  # Clear existing handler
                 self._initialize_ai_handler()
-            
+
             self.save_session()
-            return True
         except Exception as e:
+            self._parse_error = str(e)
             print(f"❌ Error parsing pcap file: {e}")
-            return False
+        finally:
+            self._parse_done.set()
+
+    def wait_for_parse(self):
+        """Block until the background parse finishes; True if data is ready."""
+        if not self._parse_done.is_set():
+            print("⏳ Waiting for pcap parsing to finish...")
+            self._parse_done.wait()
+        return self._parse_error is None and self.parsed_data is not None
 
     def get_openai_key(self):
         """Get OpenAI API key."""
-        if not self.openai_key:
-            return None
         return self.openai_key
 
+    PARSE_CACHE_IO_BUFFER = 1 << 20  # 1 MiB: pickle.load issues many small reads
+
+    def _load_parsed_cache(self, cache_path):
+        """Restore state from a parse cache index. Returns True on success."""
+        try:
+            with open(cache_path, "rb", buffering=self.PARSE_CACHE_IO_BUFFER) as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            self.log_debug(f"⚠️  Could not load parse cache: {e}")
+            return False
+        if isinstance(payload, dict) and "section_files" in payload:
+            # Per-section layout: record where each section lives and let
+            # the lazy properties fault them in on first use. Eviction can
+            # remove section files out from under a surviving index, so
+            # only sections whose file is still on disk count - and without
+            # parsed_data the cache is useless and the caller must re-parse.
+            section_files = {
+                name: path
+                for name, path in payload["section_files"].items()
+                if path and os.path.exists(path)
+            }
+            if "parsed_data" not in section_files:
+                self.log_debug("⚠️  Parse cache sections evicted; re-parsing")
+                return False
+            self.analysis_summary = payload.get("analysis_summary")
+            self._section_files = section_files
+            return True
+        if isinstance(payload, dict) and "parsed_data" in payload:
+            # Monolithic layout (pre-split)
+            self._parsed_data = payload["parsed_data"]
+            self._filtered_packets = payload.get("filtered_packets")
+            self._analysis_data = payload.get("analysis_data")
+            self.analysis_summary = payload.get("analysis_summary")
+        else:
+            # Cache written before the filtered view was included
+            self._parsed_data = payload
+        return self._parsed_data is not None
+
+    def _ensure_parsed_data(self):
+        """Make parsed data reachable: wait out a background parse, then
+        pick up the cache index deferred by load_session if there is one."""
+        self.wait_for_parse()
+        if (
+            self._parsed_data is None
+            and not self._section_files
+            and self._pending_cache_path
+        ):
+            if self._load_parsed_cache(self._pending_cache_path):
+                self.log_debug("✓ Loaded parse cache index lazily")
+            self._pending_cache_path = None
+
     def get_parsed_data(self):
-        """Get parsed pcap data."""
-        if not self.parsed_data:
-            return None
+        """Get parsed pcap data, loading it lazily on first use."""
+        self._ensure_parsed_data()
         return self.parsed_data
 
+    def get_parsed_packets(self):
+        """Decoded packet objects from parsed_data, decoded at most once.
+
+        parsed_data is stored as a JSON string; decoding a multi-MB blob
+        per filter change adds up, so the object form is cached until a
+        new parse replaces the text.
+        """
+        if self._parsed_packets is None:
+            data = self.get_parsed_data()
+            if data is None:
+                return None
+            self._parsed_packets = json_loads(data) if isinstance(data, str) else data
+        return self._parsed_packets
+
     def get_session_info(self):
         """Get current session information."""
         # Determine AI handler type
@@ -294,59 +803,187 @@ class SessionManager:
         info = {
             "openai_key_set": self.openai_key is not None,
             "pcap_file": self.pcap_file,
-            "pcap_parsed": self.parsed_data is not None,
+            "pcap_parsed": self._parsed_data is not None
+            or bool(self._section_files)
+            or self._pending_cache_path is not None,
             "ai_handler_ready": self.ai_handler is not None,
             "ai_handler_type": ai_handler_type,
             "file_size_kb": file_size_kb,
             "protocol_filter": self.last_protocols,
-            "filtered_packets_count": len(self.filtered_packets)
-            if self.filtered_packets
+            # Underscore attrs on purpose: a status check should not fault
+            # cache sections in from disk just to report on them.
+            "filtered_packets_count": len(self._filtered_packets)
+            if self._filtered_packets
             else 0,
-            "data_size": len(str(self.parsed_data)) if self.parsed_data else 0,
+            "data_size": self._parsed_data_bytes(),
         }
         return info
 
+    def _parsed_data_bytes(self):
+        """Size of the parsed data without building a giant repr.
+
+        In memory the parsed data is a JSON string, so len() is O(1);
+        otherwise the section file's size on disk stands in for it.
+        """
+        if self._parsed_data is not None:
+            return len(self._parsed_data)
+        path = self._section_files.get("parsed_data")
+        if path and os.path.exists(path):
+            return os.path.getsize(path)
+        return 0
+
+    def _load_jsonl(self, path, legacy_path):
+        """Load records from an append-only JSONL file.
+
+        Migrates a legacy JSON-array file (pre-JSONL format) in place the
+        first time it is seen, so old installs keep their data.
+        """
+        if not os.path.exists(path) and legacy_path and os.path.exists(legacy_path):
+            try:
+                with open(legacy_path, "rb") as file:
+                    legacy = json_loads(file.read())
+                _atomic_write_bytes(
+                    path, b"".join(json_dumps_bytes(e) + b"\n" for e in legacy)
+                )
+                os.remove(legacy_path)
+                self.log_debug(f"✓ Migrated {legacy_path} to {path}")
+            except (ValueError, OSError) as e:
+                self.log_debug(f"⚠️  Could not migrate {legacy_path}: {e}")
+
+        records = []
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as file:
+                    for line in file:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            records.append(json_loads(line))
+                        except ValueError:
+                            # Skip a torn/corrupt line instead of losing the file
+                            continue
+            except OSError as e:
+                print(f"⚠️  Could not read {path}: {e}")
+        return records
+
+    def _append_jsonl(self, path, entry):
+        """Append one record to a JSONL file - O(1) instead of a full rewrite."""
+        with open(path, "ab") as file:
+            file.write(json_dumps_bytes(entry) + b"\n")
+
+    def append_history(self, entry):
+        """Record a history entry in memory and persist it immediately."""
+        self.history.append(entry)
+        try:
+            self._append_jsonl(self.history_file, entry)
+        except Exception as e:
+            print(f"⚠️  Could not append to history: {e}")
+
+    def append_dataset(self, entry):
+        """Record a dataset entry in memory and persist it immediately."""
+        self.dataset.append(entry)
+        try:
+            self._append_jsonl(self.dataset_file, entry)
+        except Exception as e:
+            print(f"⚠️  Could not append to dataset: {e}")
+
     def load_history_and_dataset(self):
-        """Load history.json and dataset.json into memory."""
+        """Load the history and dataset JSONL files into memory."""
         # Ensure the .cache directory exists
         cache_dir = ".cache"
         if not os.path.exists(cache_dir):
             os.makedirs(cache_dir)
 
-        # Load history.json
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, "r") as file:
-                    self.history = json.load(file)
-                    self.log_debug("✓ History loaded successfully")
-            except json.JSONDecodeError:
-                print("⚠️  Invalid JSON in history.json. Starting with an empty history.")
-                self.history = []
-
-        # Load dataset.json
-        if os.path.exists(self.dataset_file):
-            try:
-                with open(self.dataset_file, "r") as file:
-                    self.dataset = json.load(file)
-                    self.log_debug("✓ Dataset loaded successfully")
-            except json.JSONDecodeError:
-                print("⚠️  Invalid JSON in dataset.json. Starting with an empty dataset.")
-                self.dataset = []
-
-    def save_history_and_dataset(self):
-        """Save history.json and dataset.json from memory to disk."""
+        # Publish the active session id so external tools (e.g. standalone
+        # feedback collectors) can find the current session in O(1) instead
+        # of scanning history for the newest record.
         try:
-            # Save history.json in the .cache directory
-            with open(self.history_file, "w") as file:
-                json.dump(self.history, file, indent=4)
-            self.log_debug("✓ History saved successfully")
+            with open(os.path.join(cache_dir, "current_session"), "w") as file:
+                file.write(self.session_id)
         except Exception as e:
-            print(f"⚠️  Could not save history.json: {e}")
+            self.log_debug(f"⚠️  Could not write current session id: {e}")
 
+        # One meta record per session carries the user/platform details;
+        # history entries reference it by session_id instead of repeating
+        # the same dict on every query.
         try:
-            # Save dataset.json in the main folder
-            with open(self.dataset_file, "w") as file:
-                json.dump(self.dataset, file, indent=4)
-            self.log_debug("✓ Dataset saved successfully")
+            self._append_jsonl(
+                os.path.join(cache_dir, "sessions.jsonl"),
+                {
+                    "session_id": self.session_id,
+                    "started_at": datetime.now().isoformat(),
+                    "user_details": self.user_details,
+                },
+            )
         except Exception as e:
-            print(f"⚠️  Could not save dataset.json: {e}")
+            self.log_debug(f"⚠️  Could not write session meta: {e}")
+
+        self.history = self._load_jsonl(self.history_file, ".cache/history.json")
+        if self.history:
+            self.log_debug("✓ History loaded successfully")
+        self.dataset = self._load_jsonl(self.dataset_file, "dataset.json")
+        if self.dataset:
+            self.log_debug("✓ Dataset loaded successfully")
+
+        # Prefer the persisted counters - O(1) regardless of history size.
+        # Falling back to a history scan only happens on first run or if
+        # stats.json is missing/corrupt (see rebuild_feedback_stats).
+        if not self._load_stats():
+            self.rebuild_feedback_stats()
+
+    def _load_stats(self):
+        """Load the persisted feedback counters. Returns True on success."""
+        if not os.path.exists(self.stats_file):
+            return False
+        try:
+            with open(self.stats_file, "rb") as file:
+                stats = json_loads(file.read())
+            if set(self.feedback_stats) <= set(stats):
+                self.feedback_stats = {k: stats[k] for k in self.feedback_stats}
+                return True
+        except (ValueError, OSError):
+            pass
+        return False
+
+    def _save_stats(self):
+        """Persist the feedback counters; the file is tiny so this is cheap."""
+        try:
+            _atomic_write_bytes(self.stats_file, json_dumps_bytes(self.feedback_stats))
+        except Exception as e:
+            self.log_debug(f"⚠️  Could not save feedback stats: {e}")
+
+    def rebuild_feedback_stats(self):
+        """Recompute the feedback counters from history (drift recovery)."""
+        self.feedback_stats = dict.fromkeys(self.feedback_stats, 0)
+        for entry in self.history:
+            self.feedback_stats["total_queries"] += 1
+            rating = (entry.get("feedback") or {}).get("rating")
+            if rating in ("satisfied", "neutral", "unsatisfied"):
+                self.feedback_stats["rated"] += 1
+                self.feedback_stats[rating] += 1
+        self._save_stats()
+
+    def record_feedback(self, rating=None):
+        """Update the running feedback counters for one answered query."""
+        self.feedback_stats["total_queries"] += 1
+        if rating in ("satisfied", "neutral", "unsatisfied"):
+            self.feedback_stats["rated"] += 1
+            self.feedback_stats[rating] += 1
+        self._save_stats()
+
+    def get_feedback_statistics(self):
+        """Return feedback statistics from the running counters (O(1))."""
+        stats = dict(self.feedback_stats)
+        rated = stats["rated"]
+        stats["satisfaction_rate"] = stats["satisfied"] / rated if rated else 0.0
+        return stats
+
+    def save_history_and_dataset(self):
+        """Confirm history and dataset are on disk.
+
+        Every record is appended to its JSONL file the moment it is created
+        (see append_history/append_dataset), so exit no longer rewrites the
+        whole files - this is now just a session-end log line.
+        """
+        self.log_debug("✓ History and dataset saved successfully")
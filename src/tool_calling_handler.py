@@ -4,8 +4,9 @@ import pip_system_certs.wrapt_requests
 import requests
 import os
 import getpass
-import pyshark
 import re
+from src.ai_query_handler import _pooled_session
+from src.json_utils import json_dumps_bytes
 from src.tool_factory import ToolFactory
 from src.packet_parser import PacketParser
 
@@ -18,6 +19,11 @@ class ToolCallingHandler:
         self.base_url = "https://llm-proxy-api.ai.eng.netapp.com"
         self.tool_factory = ToolFactory(session=session)  # Pass session to tool factory
         self.packet_parser = PacketParser()  # Initialize packet parser
+        # Shared pooled HTTP session (keep-alive + retries), same registry
+        # as AIQueryHandler so both handler types reuse one connection pool.
+        self._http = _pooled_session(api_key)
+        self._last_ok_ts = float("-inf")  # last successful API round-trip
+        self._probe_ttl = 60.0  # seconds before connectivity is re-probed
     
     def log_debug(self, message):
         """Print debug messages only in test mode."""
@@ -35,20 +41,15 @@ class ToolCallingHandler:
         return user
 
     def test_connection(self):
-        """Test connectivity to NetApp's internal LLM proxy API."""
-        try:
-            # Test basic internet connectivity
-            response = requests.get("https://www.google.com", timeout=5)
-            self.log_debug("✓ Internet connection: OK")
-        except requests.RequestException:
-            print("✗ Internet connection: FAILED")
-            return False
+        """Test connectivity to NetApp's internal LLM proxy API.
 
+        Probes the API endpoint directly - if it answers, intermediate
+        connectivity is implied, so there is no separate internet probe.
+        """
         try:
             # Test NetApp LLM proxy API connectivity
-            test_response = requests.post(
+            test_response = self._http.post(
                 f"{self.base_url}/chat/completions",
-                headers={"Authorization": "Bearer " + self.load_your_key()},
                 json={
                     "model": "gpt-4o",
                     "messages": [{"role": "user", "content": "test"}],
@@ -59,6 +60,7 @@ class ToolCallingHandler:
             )
 
             if test_response.status_code == 200:
+                self._last_ok_ts = time.monotonic()
                 self.log_debug("✓ NetApp LLM Proxy API connection: OK")
                 return True
             else:
@@ -80,39 +82,49 @@ class ToolCallingHandler:
         """Execute a tool function and return results."""
         return self.tool_factory.execute_tool(tool_name, arguments, analysis_data)
 
-    def extract_pyshark_filter(self, ai_response):
-        """Extract pyshark filter string from AI response."""
-        print(f"🔍 Extracting pyshark filter from AI response...")
-        
-        # Common patterns to look for pyshark filters
-        patterns = [
+    # Compiled once at class creation: filter extraction runs on every
+    # tool-calling response, so the patterns and keyword probe should not
+    # be rebuilt per call.
+    _FILTER_PATTERNS = [
+        re.compile(p, re.IGNORECASE)
+        for p in (
             r'filter[:\s]*["\']([^"\']+)["\']',  # filter: "tcp.port == 80"
             r'display_filter[:\s]*["\']([^"\']+)["\']',  # display_filter: "nfs"
             r'pyshark filter[:\s]*["\']([^"\']+)["\']',  # pyshark filter: "smb2"
             r'Filter[:\s]*["\']([^"\']+)["\']',  # Filter: "http"
             r'`([^`]+)`',  # backtick enclosed filters
             r'"([a-zA-Z0-9_\.=<>!\s&|()]+)"',  # quoted strings that look like filters
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, ai_response, re.IGNORECASE)
+        )
+    ]
+    _FILTER_KEYWORDS = ('nfs', 'smb', 'smb2', 'http', 'tcp', 'udp', 'ip',
+                        'port', '==', '!=', '&&', '||')
+    _PROTOCOL_PATTERNS = [
+        re.compile(p, re.IGNORECASE)
+        for p in (
+            r'\b(nfs)\b',
+            r'\b(smb2?)\b',
+            r'\b(http)\b',
+            r'\b(tcp\.port\s*==\s*\d+)\b',
+            r'\b(udp\.port\s*==\s*\d+)\b',
+        )
+    ]
+
+    def extract_pyshark_filter(self, ai_response):
+        """Extract pyshark filter string from AI response."""
+        print(f"🔍 Extracting pyshark filter from AI response...")
+
+        for pattern in self._FILTER_PATTERNS:
+            matches = pattern.findall(ai_response)
             for match in matches:
                 # Basic validation - should contain protocol or field names
-                if any(keyword in match.lower() for keyword in ['nfs', 'smb', 'smb2', 'http', 'tcp', 'udp', 'ip', 'port', '==', '!=', '&&', '||']):
+                lowered = match.lower()
+                if any(keyword in lowered for keyword in self._FILTER_KEYWORDS):
                     print(f"✅ Found potential pyshark filter: {match}")
                     return match.strip()
-        
+
         # If no specific filter found, look for protocol names
-        protocol_patterns = [
-            r'\b(nfs)\b',
-            r'\b(smb2?)\b', 
-            r'\b(http)\b',
-            r'\b(tcp\.port\s*==\s*\d+)\b',
-            r'\b(udp\.port\s*==\s*\d+)\b',
-        ]
-        
-        for pattern in protocol_patterns:
-            match = re.search(pattern, ai_response, re.IGNORECASE)
+        for pattern in self._PROTOCOL_PATTERNS:
+            match = pattern.search(ai_response)
             if match:
                 filter_str = match.group(1).lower()
                 print(f"✅ Found protocol-based filter: {filter_str}")
@@ -136,7 +148,15 @@ class ToolCallingHandler:
         
         try:
             # Use pyshark FileCapture with display filter
-            capture = pyshark.FileCapture(pcap_file, display_filter=filter_string)
+            import pyshark
+
+            capture = pyshark.FileCapture(
+                pcap_file,
+                display_filter=filter_string,
+                use_json=True,
+                include_raw=False,
+                keep_packets=False,
+            )
             
             # Convert packets to list
             filtered_packets = list(capture)
@@ -192,8 +212,12 @@ class ToolCallingHandler:
             + f"For AI analysis with tool calling, ensure NetApp LLM proxy access is configured."
         )
 
-    def query(self, user_question, analysis_data, conversation_history=None):
-        """Send query to NetApp's LLM proxy API with tool calling support."""
+    def query(self, user_question, analysis_data, conversation_history=None, summary=None):
+        """Send query to NetApp's LLM proxy API with tool calling support.
+
+        `summary` is accepted for interface parity with AIQueryHandler; the
+        tool-calling prompt never embeds the analysis blob, so it is unused.
+        """
 
         print("🔧 TOOL CALLING HANDLER - Starting query processing")
         print(f"📝 User Question: {user_question}")
@@ -217,7 +241,15 @@ class ToolCallingHandler:
         else:
             print("📁 No existing filtered data file found, using original analysis data")
         
-        if not self.test_connection():
+        # Re-probe connectivity only after a quiet period; every successful
+        # API call refreshes the timestamp, so steady-state queries skip the
+        # probe round-trip entirely.
+        if time.monotonic() - self._last_ok_ts > self._probe_ttl:
+            connected = self.test_connection()
+        else:
+            connected = True
+
+        if not connected:
             print("\n" + "=" * 60)
             print("NETWORK CONNECTIVITY ISSUE DETECTED")
             print("=" * 60)
@@ -225,7 +257,6 @@ class ToolCallingHandler:
             print("=" * 60)
 
             response = self.generate_offline_response(user_question, analysis_data)
-            self.append_to_dataset(user_question, response)
             return response
 
         # Prepare context for AI with tool calling
@@ -274,9 +305,8 @@ The filter will be automatically extracted and applied to the pcap file using py
                     f"Sending query with tool calling to NetApp LLM Proxy (attempt {attempt + 1}/{max_retries})..."
                 )
 
-                response = requests.post(
+                response = self._http.post(
                     f"{self.base_url}/chat/completions",
-                    headers={"Authorization": "Bearer " + self.load_your_key()},
                     json={
                         "model": "gpt-4o",
                         "messages": messages,
@@ -290,6 +320,7 @@ The filter will be automatically extracted and applied to the pcap file using py
                 )
 
                 if response.status_code == 200:
+                    self._last_ok_ts = time.monotonic()
                     result = response.json()
                     message = result["choices"][0]["message"]
                     
@@ -319,7 +350,6 @@ The filter will be automatically extracted and applied to the pcap file using py
                                 enhanced_response += f"Packets found: {filter_result.get('total_packets', 0)}\n"
                                 enhanced_response += f"Status: {filter_result.get('message', 'Filter applied successfully')}"
                                 
-                                self.append_to_dataset(user_question, enhanced_response)
                                 return enhanced_response
                             else:
                                 # Filter failed, return original response with error note
@@ -328,11 +358,9 @@ The filter will be automatically extracted and applied to the pcap file using py
                                 enhanced_response += f"Attempted filter: {pyshark_filter}\n"
                                 enhanced_response += f"Error: {error_msg}"
                                 
-                                self.append_to_dataset(user_question, enhanced_response)
                                 return enhanced_response
                         else:
                             print("ℹ️ No pyshark filter found in response")
-                            self.append_to_dataset(user_question, response_content)
                             return response_content
                         
                 else:
@@ -340,7 +368,6 @@ The filter will be automatically extracted and applied to the pcap file using py
                     print(f"Response: {response.text}")
                     if attempt == max_retries - 1:
                         response = self.generate_offline_response(user_question, analysis_data)
-                        self.append_to_dataset(user_question, response)
                         return response
 
             except requests.RequestException as e:
@@ -351,17 +378,14 @@ The filter will be automatically extracted and applied to the pcap file using py
                 else:
                     print("Failed to connect to NetApp LLM Proxy. Switching to offline mode...")
                     response = self.generate_offline_response(user_question, analysis_data)
-                    self.append_to_dataset(user_question, response)
                     return response
 
             except Exception as e:
                 print(f"Unexpected error: {e}. Switching to offline mode...")
                 response = self.generate_offline_response(user_question, analysis_data)
-                self.append_to_dataset(user_question, response)
                 return response
 
         response = self.generate_offline_response(user_question, analysis_data)
-        self.append_to_dataset(user_question, response)
         return response
 
     def _handle_tool_calls(self, message, analysis_data, user_question, messages, tools):
@@ -421,9 +445,8 @@ The filter will be automatically extracted and applied to the pcap file using py
         print("\n🔄 ROUND 1: Getting initial AI response after tool execution...")
         try:
             self.log_debug("🔄 Round 1: Getting initial AI response after tool execution...")
-            round1_response = requests.post(
+            round1_response = self._http.post(
                 f"{self.base_url}/chat/completions",
-                headers={"Authorization": "Bearer " + self.load_your_key()},
                 json={
                     "model": "gpt-4o",
                     "messages": messages,
@@ -467,9 +490,8 @@ Please analyze this filtered data and provide insights relevant to the user's or
             })
 
             try:
-                round2_response = requests.post(
+                round2_response = self._http.post(
                     f"{self.base_url}/chat/completions",
-                    headers={"Authorization": "Bearer " + self.load_your_key()},
                     json={
                         "model": "gpt-4o",
                         "messages": messages,
@@ -510,9 +532,8 @@ Summarize your findings from the analysis and provide a clear, actionable respon
         })
 
         try:
-            final_response = requests.post(
+            final_response = self._http.post(
                 f"{self.base_url}/chat/completions",
-                headers={"Authorization": "Bearer " + self.load_your_key()},
                 json={
                     "model": "gpt-4o",
                     "messages": messages,
@@ -545,7 +566,6 @@ Summarize your findings from the analysis and provide a clear, actionable respon
                         print("🎉 TOOL CALLING WORKFLOW COMPLETED SUCCESSFULLY WITH PYSHARK FILTER")
                         print("="*60)
                         self.log_debug(f"✓ Round 3 complete - Final response with pyshark filter ready")
-                        self.append_to_dataset(user_question, enhanced_response)
                         return enhanced_response
                     else:
                         # Filter failed, return original response with error note
@@ -557,7 +577,6 @@ Summarize your findings from the analysis and provide a clear, actionable respon
                         print("🎉 TOOL CALLING WORKFLOW COMPLETED (with filter error)")
                         print("="*60)
                         self.log_debug(f"✓ Round 3 complete - Final response with filter error")
-                        self.append_to_dataset(user_question, enhanced_response)
                         return enhanced_response
                 else:
                     print("ℹ️ No pyshark filter found in final response")
@@ -565,7 +584,6 @@ Summarize your findings from the analysis and provide a clear, actionable respon
                 print("🎉 TOOL CALLING WORKFLOW COMPLETED SUCCESSFULLY")
                 print("="*60)
                 self.log_debug(f"✓ Round 3 complete - Final response ready")
-                self.append_to_dataset(user_question, response_content)
                 return response_content
             elif final_response.status_code == 400:
                 error_response = final_response.json()
@@ -576,7 +594,6 @@ Summarize your findings from the analysis and provide a clear, actionable respon
                     )
                     print("⚠️ Context window exceeded - requesting more specific query")
                     self.log_debug("Context window exceeded, returning graceful message")
-                    self.append_to_dataset(user_question, graceful_message)
                     return graceful_message
             else:
                 print(f"❌ Round 3 failed: HTTP {final_response.status_code}")
@@ -584,7 +601,6 @@ Summarize your findings from the analysis and provide a clear, actionable respon
                 self.log_debug(f"Round 3 failed: HTTP {final_response.status_code}")
                 # Fallback to tool results summary
                 summary = self._summarize_tool_results(tool_results)
-                self.append_to_dataset(user_question, summary)
                 return summary
 
         except Exception as e:
@@ -592,7 +608,6 @@ Summarize your findings from the analysis and provide a clear, actionable respon
             print("🔄 Falling back to tool results summary")
             print(f"Error getting final AI response: {e}")
             summary = self._summarize_tool_results(tool_results)
-            self.append_to_dataset(user_question, summary)
             return summary
 
     def _summarize_tool_results(self, tool_results):
@@ -617,25 +632,18 @@ Summarize your findings from the analysis and provide a clear, actionable respon
         return summary.strip()
 
     def append_to_dataset(self, user_question, response):
-        """Append the query and response to a JSON file."""
+        """Append the query and response to the dataset as one JSON line.
+
+        Appending a single line keeps the cost O(1) per query instead of
+        re-reading and rewriting the whole dataset file every time.
+        """
         self.log_debug("Appending to dataset...")
-        dataset_file = "dataset.json"
+        dataset_file = "dataset.jsonl"
         entry = {"question": user_question, "response": response, "handler": "tool_calling"}
 
         try:
-            if os.path.exists(dataset_file):
-                with open(dataset_file, "r") as file:
-                    data = json.load(file)
-            else:
-                data = []
-
-            data.append(entry)
-
-            try:
-                with open(dataset_file, "w") as file:
-                    self.log_debug(f"Appending to dataset file: {dataset_file}")
-                    json.dump(data, file, indent=4)
-            except Exception as e:
-                print(f"Error writing to dataset.json: {e}")
+            with open(dataset_file, "ab") as file:
+                self.log_debug(f"Appending to dataset file: {dataset_file}")
+                file.write(json_dumps_bytes(entry) + b"\n")
         except Exception as e:
             print(f"Failed to append to dataset file: {e}")
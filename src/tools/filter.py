@@ -37,7 +37,13 @@ class Filter:
         
         try:
             # Use pyshark FileCapture with display filter
-            capture = pyshark.FileCapture(pcap_file, display_filter=filter_string)
+            capture = pyshark.FileCapture(
+                pcap_file,
+                display_filter=filter_string,
+                use_json=True,
+                include_raw=False,
+                keep_packets=False,
+            )
             
             # Convert packets to list
             filtered_packets = list(capture)
@@ -380,7 +386,12 @@ class Filter:
             if end_time.tzinfo is None:
                 end_time = end_time.replace(tzinfo=datetime.timezone.utc)
 
-        capture = pyshark.FileCapture(self.session.pcap_file)
+        capture = pyshark.FileCapture(
+            self.session.pcap_file,
+            use_json=True,
+            include_raw=False,
+            keep_packets=False,
+        )
         filtered_packets = []
         for pkt in capture:
             pkt_time = datetime.datetime.fromtimestamp(float(pkt.sniff_timestamp), tz=datetime.timezone.utc)
@@ -414,7 +425,12 @@ class Filter:
                 "packets_filtered": 0
             }
 
-        capture = pyshark.FileCapture(self.session.pcap_file)
+        capture = pyshark.FileCapture(
+            self.session.pcap_file,
+            use_json=True,
+            include_raw=False,
+            keep_packets=False,
+        )
         filtered_packets = []
         for idx, pkt in enumerate(capture, start=1):  # start=1 for Wireshark-style numbering
             if start_number <= idx <= end_number:
@@ -450,7 +466,12 @@ class Filter:
             }
 
         # First, find the request packet by packet number
-        capture = pyshark.FileCapture(self.session.pcap_file)
+        capture = pyshark.FileCapture(
+            self.session.pcap_file,
+            use_json=True,
+            include_raw=False,
+            keep_packets=False,
+        )
         request_pkt = None
         xid = None
         msg_id = None
@@ -472,7 +493,12 @@ class Filter:
             }
 
         # Now, find all packets with the same transaction ID
-        capture = pyshark.FileCapture(self.session.pcap_file)
+        capture = pyshark.FileCapture(
+            self.session.pcap_file,
+            use_json=True,
+            include_raw=False,
+            keep_packets=False,
+        )
         filtered_packets = []
         for pkt in capture:
             if protocol == "nfs" and hasattr(pkt, "nfs") and getattr(pkt.nfs, "xid", None) == xid: